@@ -34,6 +34,7 @@ from app.mcp.devtools.tools import (
     agno_run,
     agno_sessions,
     agno_trace,
+    dump_result,
 )
 
 
@@ -101,7 +102,7 @@ async def agno_list_tool(
 
     type_filter = AppType(app_type) if app_type else None
     result = await agno_list(devtools_ctx.http_client, type_filter)
-    return result.model_dump(exclude_none=True)
+    return dump_result(result)
 
 
 @mcp.tool
@@ -131,9 +132,7 @@ async def agno_run_tool(
     try:
         type_enum = AppType(app_type)
     except ValueError:
-        return RunResult(status="ERROR", error=f"Invalid app_type: {app_type}").model_dump(
-            exclude_none=True
-        )
+        return dump_result(RunResult(status="ERROR", error=f"Invalid app_type: {app_type}"))
 
     result = await agno_run(
         devtools_ctx.http_client,
@@ -142,7 +141,7 @@ async def agno_run_tool(
         message,
         timeout=config.http_timeout,
     )
-    return result.model_dump(exclude_none=True)
+    return dump_result(result)
 
 
 @mcp.tool
@@ -172,7 +171,7 @@ async def agno_trace_tool(
         level = DetailLevel.SUMMARY
 
     result = await agno_trace(devtools_ctx.db_pool, session_id, level)
-    return result.model_dump(exclude_none=True)
+    return dump_result(result)
 
 
 @mcp.tool
@@ -200,12 +199,10 @@ async def agno_sessions_tool(
         try:
             type_filter = AppType(app_type)
         except ValueError:
-            return SessionsResult(error=f"Invalid app_type: {app_type}").model_dump(
-                exclude_none=True
-            )
+            return dump_result(SessionsResult(error=f"Invalid app_type: {app_type}"))
 
     result = await agno_sessions(devtools_ctx.db_pool, type_filter, app_id, limit)
-    return result.model_dump(exclude_none=True)
+    return dump_result(result)
 
 
 if __name__ == "__main__":
@@ -8,12 +8,12 @@ Provides 4 MCP tools for AI agents to test and debug Agno applications:
     - agno_sessions: List historical sessions
 """
 
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 from typing import Any, Literal
 
 import httpx
 from psycopg_pool import AsyncConnectionPool
-from pydantic import BaseModel, Field
 
 
 class AppType(str, Enum):
@@ -43,7 +43,13 @@ class SessionStatus(str, Enum):
     NOT_FOUND = "NOT_FOUND"
 
 
-class RunResult(BaseModel):
+# Result types are only turned into plain dicts for MCP transport, so they are
+# slotted dataclasses rather than pydantic models: no validation pass and no
+# per-instance __dict__ on every agno_trace poll. Use dump_result() to serialize.
+
+
+@dataclass(slots=True)
+class RunResult:
     """Result from agno_run tool."""
 
     session_id: str | None = None
@@ -51,7 +57,8 @@ class RunResult(BaseModel):
     error: str | None = None
 
 
-class TraceResult(BaseModel):
+@dataclass(slots=True)
+class TraceResult:
     """Result from agno_trace tool."""
 
     session_id: str
@@ -62,16 +69,18 @@ class TraceResult(BaseModel):
     error: str | None = None
 
 
-class ListResult(BaseModel):
+@dataclass(slots=True)
+class ListResult:
     """Result from agno_list tool."""
 
-    agents: list[dict[str, str]] = Field(default_factory=list)
-    teams: list[dict[str, str]] = Field(default_factory=list)
-    workflows: list[dict[str, str]] = Field(default_factory=list)
+    agents: list[dict[str, str]] = field(default_factory=list)
+    teams: list[dict[str, str]] = field(default_factory=list)
+    workflows: list[dict[str, str]] = field(default_factory=list)
     error: str | None = None
 
 
-class SessionInfo(BaseModel):
+@dataclass(slots=True)
+class SessionInfo:
     """Session information for agno_sessions tool."""
 
     session_id: str
@@ -80,13 +89,23 @@ class SessionInfo(BaseModel):
     created_at: str
 
 
-class SessionsResult(BaseModel):
+@dataclass(slots=True)
+class SessionsResult:
     """Result from agno_sessions tool."""
 
-    sessions: list[SessionInfo] = Field(default_factory=list)
+    sessions: list[SessionInfo] = field(default_factory=list)
     error: str | None = None
 
 
+def _drop_none(items: list[tuple[str, Any]]) -> dict[str, Any]:
+    return {k: v for k, v in items if v is not None}
+
+
+def dump_result(result: Any) -> dict[str, Any]:
+    """Serialize a tool result to a plain dict for MCP, omitting None fields."""
+    return asdict(result, dict_factory=_drop_none)
+
+
 async def agno_list(
     http_client: httpx.AsyncClient,
     app_type: AppType | None = None,
@@ -34,14 +34,16 @@ from app.models.factory import (
     create_gpt_4_1,
     create_model,
     create_model_from_dict,
+    create_models,
     create_ollama_local,
     create_openai_gpt4o,
     create_volcengine_doubao,
     get_model_info,
 )
 from app.models.features import ModelFeature
+from app.models.parallel import first_completed_chat, multi_chat
 from app.models.pricing import ModelPricing
-from app.models.provider_registry import ProviderRegistry, get_registry
+from app.models.provider_registry import ProviderRegistry, get_registry, register_adapter
 from app.models.registry import MODEL_REGISTRY, ModelCapabilities
 from app.models.variants import ModelVariant
 
@@ -64,7 +66,11 @@ __all__ = [
     # 工厂函数
     "create_model",
     "create_model_from_dict",
+    "create_models",
     "get_model_info",
+    # 多模型并发
+    "multi_chat",
+    "first_completed_chat",
     # OpenRouter 便捷函数
     "create_gemini_flash",
     "create_gemini_pro",
@@ -82,4 +88,5 @@ __all__ = [
     "ModelCapabilities",
     "ProviderRegistry",
     "get_registry",
+    "register_adapter",
 ]
@@ -2,13 +2,44 @@
 模型适配器模块
 
 提供统一的多 Provider 适配器抽象。
+
+适配器类按需导入 (PEP 562 模块级 __getattr__)：导入本包不会加载各厂商适配器模块，
+首次访问对应类时才导入。
 """
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from app.models.adapters.base import BaseModelAdapter
-from app.models.adapters.dashscope import DashScopeAdapter
-from app.models.adapters.gateway import GatewayAdapter
-from app.models.adapters.native import NativeAdapter
-from app.models.adapters.volcengine import VolcengineAdapter
+
+if TYPE_CHECKING:
+    from app.models.adapters.dashscope import DashScopeAdapter
+    from app.models.adapters.gateway import GatewayAdapter
+    from app.models.adapters.native import NativeAdapter
+    from app.models.adapters.volcengine import VolcengineAdapter
+
+# 类名 -> 所在模块
+_ADAPTERS = {
+    "GatewayAdapter": "app.models.adapters.gateway",
+    "NativeAdapter": "app.models.adapters.native",
+    "DashScopeAdapter": "app.models.adapters.dashscope",
+    "VolcengineAdapter": "app.models.adapters.volcengine",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _ADAPTERS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_ADAPTERS])
+
 
 __all__ = [
     "BaseModelAdapter",
@@ -0,0 +1,80 @@
+"""
+JSON 解析与序列化
+
+- 结构化输出解析: loads / attach_parsed
+- 流式 chunk 序列化: dumps_chunk / sse_encode
+
+优先使用 orjson (比标准库 json 快数倍)，未安装时回退到标准库 json。
+"""
+
+import json
+import logging
+from collections.abc import Callable
+from functools import cache
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def _get_loads() -> Callable[[str | bytes], Any]:
+    """首次调用时选择 JSON 解析函数"""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads
+    return orjson.loads
+
+
+@cache
+def _get_dumps() -> Callable[[Any], bytes]:
+    """首次调用时选择 JSON 序列化函数 (输出 UTF-8 bytes)"""
+    try:
+        import orjson
+    except ImportError:
+
+        def _stdlib_dumps(obj: Any) -> bytes:
+            return json.dumps(
+                obj, ensure_ascii=False, separators=(",", ":"), default=_default
+            ).encode()
+
+        return _stdlib_dumps
+
+    def _orjson_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default)
+
+    return _orjson_dumps
+
+
+def _default(obj: Any) -> Any:
+    """序列化 SDK 对象 (如 tool_calls): pydantic 模型转 dict，其余转字符串"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    """解析 JSON (orjson.JSONDecodeError 是 ValueError 的子类，异常处理与 json 一致)"""
+    return _get_loads()(data)
+
+
+def dumps_chunk(chunk: dict[str, Any]) -> bytes:
+    """序列化一个 chat 结果 / 流式 chunk (去掉不可序列化的 raw SDK 响应)"""
+    if "raw" in chunk:
+        chunk = {key: value for key, value in chunk.items() if key != "raw"}
+    return _get_dumps()(chunk)
+
+
+def sse_encode(chunk: dict[str, Any]) -> bytes:
+    """编码为一条 SSE 事件 ("data: <json>" 加空行结尾)"""
+    return b"data: " + dumps_chunk(chunk) + b"\n\n"
+
+
+def attach_parsed(result: dict[str, Any]) -> dict[str, Any]:
+    """解析结构化输出的 content，写入 result["parsed"] (解析失败时为 None)"""
+    try:
+        result["parsed"] = loads(result["content"])
+    except (TypeError, ValueError):
+        logger.warning("Structured output content is not valid JSON")
+        result["parsed"] = None
+    return result
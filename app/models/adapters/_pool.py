@@ -0,0 +1,64 @@
+"""
+共享 HTTP 连接池
+
+直接构造 SDK 客户端的适配器复用同一个 httpx.Client / httpx.AsyncClient，
+共享 keep-alive 连接和 TLS 会话，避免每个客户端各自维护一套连接池。
+
+httpx 在首次创建客户端时才导入 (导入耗时约几十毫秒)，导入适配器模块本身不付出这部分成本。
+"""
+
+import asyncio
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from weakref import WeakKeyDictionary
+
+if TYPE_CHECKING:
+    import httpx
+
+_TIMEOUT_SECONDS = 600.0
+_CONNECT_TIMEOUT_SECONDS = 5.0
+_MAX_KEEPALIVE_CONNECTIONS = 64
+_MAX_CONNECTIONS = 256
+
+# 事件循环 -> AsyncClient (异步连接池绑定创建它的事件循环，不能跨循环共享)
+_async_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    WeakKeyDictionary()
+)
+
+
+@lru_cache(maxsize=1)
+def shared_http_client() -> "httpx.Client":
+    """获取进程内共享的同步 httpx.Client (首次调用时创建)"""
+    import httpx
+
+    return httpx.Client(
+        timeout=httpx.Timeout(_TIMEOUT_SECONDS, connect=_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=_MAX_CONNECTIONS,
+        ),
+    )
+
+
+def shared_async_http_client() -> "httpx.AsyncClient":
+    """获取当前事件循环内共享的 httpx.AsyncClient (首次调用时创建，需在协程中调用)"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        import httpx
+
+        client = _async_clients[loop] = httpx.AsyncClient(
+            timeout=httpx.Timeout(_TIMEOUT_SECONDS, connect=_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=_MAX_CONNECTIONS,
+            ),
+        )
+    return client
+
+
+async def aclose_shared_http_client() -> None:
+    """关闭当前事件循环的共享 AsyncClient (应用关闭时调用，如 FastAPI lifespan)"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,141 @@
+"""
+Single-flight 请求合并
+
+相同 key 的请求同时在途时只真正执行一次，其余调用方等待同一个结果。
+有等待方时每个调用方拿到结果的独立深拷贝，修改结果 (如 attach_parsed) 不会影响其他调用方；
+没有等待方时直接返回原结果，不付出复制成本。
+只合并在途请求，不缓存已完成的结果。
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from copy import deepcopy
+from typing import Any, TypeVar, cast
+from weakref import WeakKeyDictionary
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """执行调用的协程被取消 (等待方收到后重新发起调用，不跟着被取消)"""
+
+
+def request_key(*parts: Any) -> str:
+    """根据请求内容生成合并 key (JSON 规范化后取 blake2b 摘要)"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class _Call:
+    """一次在途调用 (结果 future + 等待方数量)"""
+
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: Any) -> None:
+        self.future = future
+        self.waiters = 0
+
+
+def _publish(future: Any, result: T, shared: bool) -> T:
+    """
+    发布执行方的结果，返回执行方自己使用的结果
+
+    有等待方时原结果留给等待方各自复制，执行方拿一份副本；
+    复制失败 (如 SDK 对象不支持 deepcopy) 时 future 以该异常结束，等待方不会一直阻塞。
+    """
+    if not shared:
+        future.set_result(result)
+        return result
+    try:
+        own = deepcopy(result)
+    except Exception as e:
+        future.set_exception(e)
+        # 标记异常已读取，等待方都已离开时不会输出 "exception was never retrieved"
+        future.exception()
+        return result
+    future.set_result(result)
+    return own
+
+
+class SingleFlight:
+    """线程安全的 single-flight (同步调用；异步调用经 asyncio.to_thread 同样适用)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """执行 fn；若相同 key 的调用正在进行，则等待其结果 (异常同样共享)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call(Future())
+            else:
+                call.waiters += 1
+
+        if not leader:
+            return cast(T, deepcopy(call.future.result()))
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.future.set_exception(e)
+            raise
+        finally:
+            # 移除后不会再有新的等待方加入，此后读取 waiters 是确定的
+            with self._lock:
+                del self._calls[key]
+        return _publish(call.future, result, call.waiters > 0)
+
+
+class AsyncSingleFlight:
+    """
+    事件循环内的 single-flight (协程调用)
+
+    在途调用按事件循环分别记录，同一个实例可以在多个事件循环中使用，只在同一个循环内合并。
+    """
+
+    def __init__(self) -> None:
+        self._calls: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, _Call]] = (
+            WeakKeyDictionary()
+        )
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行 fn；若相同 key 的调用正在进行，则等待其结果 (异常同样共享)
+
+        执行调用的协程被取消时，等待方不会跟着被取消，而是重新发起调用 (其中一个成为新的执行方)。
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+
+        while (call := calls.get(key)) is not None:
+            call.waiters += 1
+            try:
+                # shield: 某个等待方被取消时不影响共享的调用
+                return cast(T, deepcopy(await asyncio.shield(call.future)))
+            except _LeaderCancelled:
+                continue
+            finally:
+                call.waiters -= 1
+
+        call = calls[key] = _Call(loop.create_future())
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.future.set_exception(_LeaderCancelled())
+            call.future.exception()
+            raise
+        except BaseException as e:
+            call.future.set_exception(e)
+            # 标记异常已读取，没有等待方时不会输出 "exception was never retrieved"
+            call.future.exception()
+            raise
+        finally:
+            del calls[key]
+        return _publish(call.future, result, call.waiters > 0)
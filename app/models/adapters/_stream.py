@@ -0,0 +1,178 @@
+"""
+流式输出合并
+
+逐 token 产出的 chunk 会让下游 (SSE / WebSocket) 每个 token 都序列化、写一次网络。
+这里在一个很短的时间窗口内合并增量 chunk，下游帧数明显减少。
+
+合并默认关闭 (ModelConfig.stream_coalesce_ms = 0)，开启后:
+- 流的第一个 chunk 立即产出，不增加首 token 延迟
+- 异步流按真实的截止时间冲刷缓冲区，缓冲的 chunk 最多等待一个合并窗口
+- 同步流无法在等待上游时冲刷，只在下一个 chunk 到达时检查窗口，
+  上游两个 chunk 间隔较长时，已缓冲的 chunk 要等到下一个 chunk 到达才产出
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+
+class _Buffer:
+    """待合并的 chunk 缓冲区"""
+
+    __slots__ = ("content", "reasoning", "last", "size")
+
+    content: list[str]
+    reasoning: list[str]
+    last: dict[str, Any] | None
+    size: int
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self.content = []
+        self.reasoning = []
+        self.last = None
+        self.size = 0
+
+    def __bool__(self) -> bool:
+        return self.last is not None
+
+    def add(self, chunk: dict[str, Any]) -> None:
+        text = chunk["content"] or ""
+        self.content.append(text)
+        self.size += len(text)
+        if "reasoning" in chunk:
+            self.reasoning.append(chunk["reasoning"])
+            self.size += len(chunk["reasoning"])
+        self.last = chunk
+
+    def full(self, max_chunks: int, max_chars: int) -> bool:
+        return len(self.content) >= max_chunks or self.size >= max_chars
+
+    def flush(self) -> dict[str, Any]:
+        """合并产出缓冲区 (raw 取最后一个 chunk 的 raw，若有) 并清空"""
+        assert self.last is not None
+        chunk: dict[str, Any] = {"content": "".join(self.content)}
+        if "raw" in self.last:
+            chunk["raw"] = self.last["raw"]
+        if self.reasoning:
+            chunk["reasoning"] = "".join(self.reasoning)
+        self.clear()
+        return chunk
+
+
+def coalesce_chunks(
+    chunks: Iterator[dict[str, Any]],
+    max_delay: float,
+    max_chunks: int = 8,
+    max_chars: int = 64,
+) -> Iterator[dict[str, Any]]:
+    """
+    合并同步流式 chunk
+
+    第一个 chunk 立即产出；之后缓冲区中的 content / reasoning 在以下任一条件满足时合并产出:
+    - 新 chunk 到达时，距第一个缓冲 chunk 已过 max_delay 秒
+    - 已缓冲 max_chunks 个 chunk
+    - 已缓冲 max_chars 个字符
+
+    携带 usage 的收尾 chunk 会先冲刷缓冲区，再原样产出。
+    """
+    buffer = _Buffer()
+    first = True
+    started = 0.0
+
+    for chunk in chunks:
+        if first or "usage" in chunk:
+            if buffer:
+                yield buffer.flush()
+            first = False
+            yield chunk
+            continue
+
+        if not buffer:
+            started = time.monotonic()
+        buffer.add(chunk)
+
+        if buffer.full(max_chunks, max_chars) or time.monotonic() - started >= max_delay:
+            yield buffer.flush()
+
+    if buffer:
+        yield buffer.flush()
+
+
+async def acoalesce_chunks(
+    chunks: AsyncIterator[dict[str, Any]],
+    max_delay: float,
+    max_chunks: int = 8,
+    max_chars: int = 64,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    合并异步流式 chunk
+
+    规则与 coalesce_chunks() 相同，但等待上游时也会在截止时间 (第一个缓冲 chunk 到达后 max_delay 秒)
+    冲刷缓冲区，不会因为上游停顿而拖延已到达的内容。
+    """
+    loop = asyncio.get_running_loop()
+    buffer = _Buffer()
+    first = True
+    deadline = 0.0
+    pending: asyncio.Future[dict[str, Any]] | None = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(chunks))
+            if buffer:
+                done, _ = await asyncio.wait({pending}, timeout=max(deadline - loop.time(), 0))
+                if not done:
+                    yield buffer.flush()
+                    continue
+
+            try:
+                chunk = await pending
+            except StopAsyncIteration:
+                break
+            finally:
+                pending = None
+
+            if first or "usage" in chunk:
+                if buffer:
+                    yield buffer.flush()
+                first = False
+                yield chunk
+                continue
+
+            if not buffer:
+                deadline = loop.time() + max_delay
+            buffer.add(chunk)
+
+            if buffer.full(max_chunks, max_chars):
+                yield buffer.flush()
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+    if buffer:
+        yield buffer.flush()
+
+
+def coalesce_stream(
+    chunks: Iterator[dict[str, Any]],
+    coalesce_ms: int,
+) -> Iterator[dict[str, Any]]:
+    """按 ModelConfig.stream_coalesce_ms 合并同步流式 chunk (为 0 时原样返回)"""
+    if coalesce_ms <= 0:
+        return chunks
+    return coalesce_chunks(chunks, coalesce_ms / 1000)
+
+
+def acoalesce_stream(
+    chunks: AsyncIterator[dict[str, Any]],
+    coalesce_ms: int,
+) -> AsyncIterator[dict[str, Any]]:
+    """按 ModelConfig.stream_coalesce_ms 合并异步流式 chunk (为 0 时原样返回)"""
+    if coalesce_ms <= 0:
+        return chunks
+    return acoalesce_chunks(chunks, coalesce_ms / 1000)
@@ -5,20 +5,101 @@
 """
 
 import hashlib
+import importlib
 import logging
 import os
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Callable
+from functools import cache
+from typing import TYPE_CHECKING, Any
 
 from app.models.config import (
     PROVIDER_DEFAULT_ENV_VARS,
     ModelConfig,
-    ModelProvider,
     ProjectConfig,
 )
 
+if TYPE_CHECKING:
+    from agno.models.base import Model
+
 logger = logging.getLogger(__name__)
 
+# provider_id (str) -> 默认 API Key 环境变量名，避免每次实例化都构造 ModelProvider 枚举
+_DEFAULT_ENV_BY_ID: dict[str, str | None] = {
+    provider.value: env_var for provider, env_var in PROVIDER_DEFAULT_ENV_VARS.items()
+}
+
+
+def _resolve_api_key(
+    agent_env: str | None,
+    project_env: str | None,
+    default_env: str | None,
+) -> str | None:
+    """
+    按 Agent -> Project -> Global 优先级读取 API Key
+
+    不缓存: 只在创建模型实例时调用，每次直接读取 os.environ，
+    轮换 API Key 后立即生效，也不在进程内长期持有 API Key 明文。
+    """
+    for level, env_var in (("Agent", agent_env), ("Project", project_env), ("Global", default_env)):
+        if env_var and (api_key := os.environ.get(env_var)):
+            logger.debug("Using %s-level API Key from %s", level, env_var)
+            return api_key
+    return None
+
+
+def resolve_env(*env_vars: str | None) -> str | None:
+    """
+    按顺序返回第一个非空的环境变量值 (如 Ollama Host、LiteLLM API Base)
+
+    不缓存: 只在创建模型实例时调用，每次直接读取 os.environ，运行中修改环境变量立即生效。
+    """
+    for env_var in env_vars:
+        if env_var and (value := os.environ.get(env_var)):
+            return value
+    return None
+
+
+def select_params(config: ModelConfig, param_map: tuple[tuple[str, str], ...]) -> dict[str, Any]:
+    """
+    按参数表从 config 提取 SDK 参数
+
+    Args:
+        config: 模型配置
+        param_map: (ModelConfig 字段名, SDK 参数名) 元组；值为 None 或空列表时不传
+    """
+    return {
+        name: value
+        for field_name, name in param_map
+        if (value := getattr(config, field_name)) is not None and value != []
+    }
+
+
+def _cache_key(provider_id: str, model_id: str, api_key: str) -> str:
+    """模型实例缓存 Key (API Key 只保留 sha256 前缀；不做缓存，避免长期持有 API Key 明文)"""
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return f"{provider_id}:{model_id}:{key_hash}"
+
+
+@cache
+def load_model_class(module_name: str, class_name: str, package: str) -> "Callable[..., Model]":
+    """
+    导入 Agno 模型类 (首次调用时导入，之后直接返回缓存结果)
+
+    Args:
+        module_name: 模块路径，如 "agno.models.anthropic"
+        class_name: 类名，如 "Claude"
+        package: 导入失败时提示安装的包名
+    """
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(
+            f"{package} package not found. Install with: pip install {package}"
+        ) from e
+    model_class: Callable[..., Model] = getattr(module, class_name)
+    return model_class
+
 
 class BaseModelAdapter(ABC):
     """模型适配器基类 - 统一 _get_api_key 实现，消除重复代码"""
@@ -35,43 +116,23 @@ class BaseModelAdapter(ABC):
     ):
         self.provider_id = provider_id
         self.provider_name = provider_name
-        self.default_env_var = default_env_var or PROVIDER_DEFAULT_ENV_VARS.get(
-            ModelProvider(provider_id)
-        )
+        self.default_env_var = default_env_var or _DEFAULT_ENV_BY_ID.get(provider_id)
 
     def get_api_key(
         self,
         config: ModelConfig,
         project_config: ProjectConfig | None = None,
     ) -> str | None:
-        """获取 API Key (三层优先级) - 统一实现，消除 9 处重复"""
-        # 1. Agent 级
-        if config.api_key_env:
-            api_key = os.environ.get(config.api_key_env)
-            if api_key:
-                logger.debug("Using Agent-level API Key from %s", config.api_key_env)
-                return api_key
-
-        # 2. Project 级
-        if project_config and project_config.api_key_env:
-            api_key = os.environ.get(project_config.api_key_env)
-            if api_key:
-                logger.debug("Using Project-level API Key from %s", project_config.api_key_env)
-                return api_key
-
-        # 3. Global 级
-        if self.default_env_var:
-            api_key = os.environ.get(self.default_env_var)
-            if api_key:
-                logger.debug("Using Global API Key from %s", self.default_env_var)
-                return api_key
-
-        return None
+        """获取 API Key (三层优先级: Agent 级 -> Project 级 -> Global 级)"""
+        return _resolve_api_key(
+            config.api_key_env,
+            project_config.api_key_env if project_config else None,
+            self.default_env_var,
+        )
 
     def get_cache_key(self, config: ModelConfig, api_key: str) -> str:
         """生成缓存 Key"""
-        key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
-        return f"{self.provider_id}:{config.model_id}:{key_hash}"
+        return _cache_key(self.provider_id, config.model_id, api_key)
 
     @abstractmethod
     def create_model(
@@ -6,15 +6,167 @@
 特性: 联网搜索, 多模态, 文档理解
 """
 
+import asyncio
+import hashlib
 import logging
-from collections.abc import Iterator
-from typing import Any
-
-from app.models.adapters.base import BaseModelAdapter
+import os
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator
+from functools import cache, lru_cache
+from itertools import chain
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Any, cast
+from weakref import WeakKeyDictionary
+
+from app.models.adapters._json import attach_parsed, loads
+from app.models.adapters._pool import shared_async_http_client, shared_http_client
+from app.models.adapters._singleflight import AsyncSingleFlight, SingleFlight, request_key
+from app.models.adapters._stream import acoalesce_stream, coalesce_stream
+from app.models.adapters.base import BaseModelAdapter, select_params
 from app.models.config import ModelConfig, ProjectConfig
 
 logger = logging.getLogger(__name__)
 
+# 每个实例最多记住的已上传文件数 (sha256 -> file_id)
+_FILE_ID_CACHE_SIZE = 128
+
+# 已上传文件的 file_id 有效期 (秒)，超过后重新上传
+_FILE_ID_TTL = 24 * 3600
+
+# 显式缓存要求前缀至少 1024 tokens，按约 4 字符/token 粗略估算
+_PROMPT_CACHE_MIN_CHARS = 4096
+
+# OpenAI 兼容接口 (qwen-long 文件对话)
+_COMPATIBLE_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+
+_END = object()
+
+# content 项中出现任一 key 即为多模态消息
+_MULTIMODAL_KEYS = frozenset({"image", "video"})
+
+
+@cache
+def _load_dashscope() -> Any:
+    """
+    导入 dashscope SDK
+
+    保持惰性: 只在首次创建 DashScopeModel 时导入 (dashscope 会带入 requests/aiohttp 等，
+    不在模块导入时加载以免拖慢启动)，之后直接返回缓存的模块。
+    """
+    try:
+        import dashscope
+    except ImportError as e:
+        raise ImportError("dashscope package not found. Install with: pip install dashscope") from e
+    return dashscope
+
+
+def _with_cache_control(msg: dict[str, Any]) -> dict[str, Any]:
+    """为较长的 system 消息标记显式缓存 (cache_control)，其余消息原样返回"""
+    content = msg.get("content")
+    if (
+        msg.get("role") != "system"
+        or not isinstance(content, str)
+        or len(content) < _PROMPT_CACHE_MIN_CHARS
+    ):
+        return msg
+    return {
+        **msg,
+        "content": [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}],
+    }
+
+
+_output_text = attrgetter("text")
+_usage_fields = attrgetter("input_tokens", "output_tokens", "total_tokens")
+# OpenAI 兼容接口 (qwen-long 文件对话) 的 usage 字段
+_openai_usage_fields = attrgetter("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+def _choice_content(output: Any) -> str:
+    """从 message 格式的 output 中取出首个 choice 的内容"""
+    return output.choices[0].message.content if getattr(output, "choices", None) else ""
+
+
+def _join_text_parts(content: list[Any]) -> str:
+    """拼接多模态 content 中的文本片段 (生成器直接喂给 join，不构造中间列表)"""
+    return "".join(c["text"] for c in content if type(c) is dict and "text" in c)
+
+
+# (ModelConfig 字段名, DashScope 参数名)
+_PARAM_MAP = (
+    ("temperature", "temperature"),
+    ("max_tokens", "max_tokens"),
+    ("top_p", "top_p"),
+    ("top_k", "top_k"),
+    ("seed", "seed"),
+    ("stop", "stop"),
+)
+
+
+def _build_base_params(model_id: str, config: ModelConfig) -> dict[str, Any]:
+    """根据 config 构建与消息无关的固定参数"""
+    params: dict[str, Any] = {"model": model_id, **select_params(config, _PARAM_MAP)}
+
+    # 联网搜索
+    if config.web_search.enabled:
+        params["enable_search"] = True
+        search_options: dict[str, Any] = {}
+        if config.web_search.dashscope_search_strategy != "standard":
+            search_options["search_strategy"] = config.web_search.dashscope_search_strategy
+        if config.web_search.dashscope_forced_search:
+            search_options["forced_search"] = True
+        if search_options:
+            params["search_options"] = search_options
+
+    # 思考模式 (Qwen3-Thinking)
+    if config.reasoning.enabled:
+        params["extra_body"] = {"enable_thinking": True}
+
+    # 结构化输出
+    if config.structured_output.enabled:
+        params["response_format"] = {"type": "json_object"}
+
+    return params
+
+
+@lru_cache(maxsize=128)
+def _cached_base_params(model_id: str, config: ModelConfig) -> MappingProxyType[str, Any]:
+    return MappingProxyType(_build_base_params(model_id, config))
+
+
+def _base_params(model_id: str, config: ModelConfig) -> MappingProxyType[str, Any]:
+    """
+    按 (model_id, config) 缓存固定参数模板
+
+    模板在实例间共享且只读 (MappingProxyType)，每次请求展开为新的 dict；
+    config 含 list/dict 字段 (如 stop) 时不可哈希，退回直接构建。
+    """
+    try:
+        return _cached_base_params(model_id, config)
+    except TypeError:
+        return MappingProxyType(_build_base_params(model_id, config))
+
+
+def _file_digest(file_path: str) -> str:
+    """计算文件内容的 sha256 (分块读取)"""
+    with open(file_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+async def _iterate_in_thread(iterator: Iterator[dict[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+    """在线程池中逐个取出同步迭代器的元素 (SDK 不支持异步时的流式兜底)"""
+    while (item := await asyncio.to_thread(next, iterator, _END)) is not _END:
+        yield cast(dict[str, Any], item)
+
+
+def _file_messages(file_id: str, query: str) -> list[dict[str, Any]]:
+    """构建 qwen-long 文件对话消息 (system 中以 fileid:// 引用文件)"""
+    return [
+        {"role": "system", "content": f"fileid://{file_id}"},
+        {"role": "user", "content": query},
+    ]
+
 
 class DashScopeModel:
     """
@@ -30,6 +182,21 @@ class DashScopeModel:
     - 使用 upload_file() 上传 PDF 获取 file_id
     - 在 system message 中使用 fileid://{file_id} 引用
     - 使用 qwen-long 模型处理文档
+
+    批量处理:
+    - chat_batch() 将多个独立 prompt 合并为一次请求，按编号拆回结果
+
+    异步并发:
+    - achat() 使用 AioGeneration / AioMultiModalConversation，不阻塞事件循环
+      (SDK 版本较旧、没有异步接口时退回线程池执行)
+    - achat_many() 以有限并发同时发起多个请求
+    - aupload_file() / achat_with_file() / achat_with_pdf() 文档问答的异步版本
+      (上传在线程池中执行，提问使用 AsyncOpenAI)
+    - achat_with_pdfs() 以有限并发同时处理多个文档
+
+    资源释放:
+    - OpenAI / AsyncOpenAI 客户端按实例创建一次并复用
+    - close() / aclose() 释放客户端，也可使用 with / async with
     """
 
     def __init__(
@@ -39,74 +206,53 @@ class DashScopeModel:
         config: ModelConfig,
     ):
         self.api_key = api_key
-        try:
-            import dashscope
-        except ImportError as e:
-            raise ImportError(
-                "dashscope package not found. Install with: pip install dashscope"
-            ) from e
-
+        dashscope = _load_dashscope()
         dashscope.api_key = api_key
         self.model_id = model_id
         self.config = config
         self._dashscope = dashscope
+        self._generation = dashscope.Generation
+        self._multimodal_conversation = dashscope.MultiModalConversation
+        # 异步接口 (较旧的 SDK 没有，此时 achat 退回线程池执行)
+        self._aio_generation = getattr(dashscope, "AioGeneration", None)
+        self._aio_multimodal_conversation = getattr(dashscope, "AioMultiModalConversation", None)
+        # OpenAI 兼容客户端按需创建后复用，保持连接池 (keep-alive) 跨调用
+        self._openai_client: Any = None
+        # 异步客户端底层的连接池绑定事件循环 (见 _pool)，按事件循环分别缓存
+        self._async_openai_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, Any] = (
+            WeakKeyDictionary()
+        )
+        # 按文件内容 sha256 缓存 (file_id, 上传时间)，同一文件重复提问时只上传一次
+        self._file_ids: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        # (绝对路径, mtime_ns, 大小) -> sha256，文件未变化时不重新计算
+        self._file_digests: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        # 固定参数只与 (model_id, config) 有关，相同配置的实例共享同一份只读模板
+        self._base_params = _base_params(model_id, config)
+        # 相同的在途非流式请求只发送一次 (仅在输出确定或显式开启时)
+        self._dedupe = config.dedupe_requests or config.temperature == 0
+        self._inflight = SingleFlight()
+        self._ainflight = AsyncSingleFlight()
 
     def _build_params(self, messages: list[dict[str, Any]]) -> dict[str, Any]:
-        """构建 DashScope API 参数"""
-        params: dict[str, Any] = {
-            "model": self.model_id,
-            "messages": messages,
-        }
-
-        # 通用参数
-        if self.config.temperature is not None:
-            params["temperature"] = self.config.temperature
-        if self.config.max_tokens is not None:
-            params["max_tokens"] = self.config.max_tokens
-        if self.config.top_p is not None:
-            params["top_p"] = self.config.top_p
-        if self.config.top_k is not None:
-            params["top_k"] = self.config.top_k
-        if self.config.seed is not None:
-            params["seed"] = self.config.seed
-        if self.config.stop:
-            params["stop"] = self.config.stop
-
-        # 联网搜索
-        if self.config.web_search.enabled:
-            params["enable_search"] = True
-            search_options: dict[str, Any] = {}
-            if self.config.web_search.dashscope_search_strategy != "standard":
-                search_options["search_strategy"] = self.config.web_search.dashscope_search_strategy
-            if self.config.web_search.dashscope_forced_search:
-                search_options["forced_search"] = True
-            if search_options:
-                params["search_options"] = search_options
-
-        # 思考模式 (Qwen3-Thinking)
-        if self.config.reasoning.enabled:
-            params["extra_body"] = {"enable_thinking": True}
-
-        # 结构化输出
-        if self.config.structured_output.enabled:
-            params["response_format"] = {"type": "json_object"}
-
-        return params
+        """构建 DashScope API 参数 (固定参数 + 本次消息)"""
+        if self.config.prompt_cache:
+            messages = [_with_cache_control(msg) for msg in messages]
+        return {**self._base_params, "messages": messages}
 
     def _is_multimodal(self, messages: list[dict[str, Any]]) -> bool:
-        """检测消息是否包含多模态内容（图片/视频）"""
-        for msg in messages:
-            content = msg.get("content", [])
-            if isinstance(content, list):
-                for item in content:
-                    if isinstance(item, dict) and ("image" in item or "video" in item):
-                        return True
-        return False
+        """检测消息是否包含多模态内容（图片/视频），命中第一个即返回"""
+        items = chain.from_iterable(
+            content for msg in messages if isinstance(content := msg.get("content"), list)
+        )
+        return any(
+            isinstance(item, dict) and not _MULTIMODAL_KEYS.isdisjoint(item) for item in items
+        )
 
     def chat(
         self,
         messages: list[dict[str, Any]],
         stream: bool = False,
+        include_raw: bool = False,
     ) -> dict[str, Any] | Iterator[dict[str, Any]]:
         """
         发送聊天请求
@@ -114,57 +260,262 @@ class DashScopeModel:
         自动检测多模态消息并使用对应 API:
         - 多模态消息 (图片/视频): MultiModalConversation
         - 纯文本消息: Generation
+
+        temperature=0 或开启 dedupe_requests 时，相同的在途非流式请求会合并为一次调用，
+        各调用方拿到结果 dict 的独立副本。
+
+        流式 chunk 默认不携带 raw (SDK 原始响应)，需要时传 include_raw=True。
+
+        流式输出格式 (纯文本 Generation):
+        - 增量 chunk: {"content": ...}，不再携带 usage
+        - 流结束后额外产出一个收尾 chunk: {"content": "", "usage": {...}}，
+          读取 usage 时以带 "usage" 键的 chunk 为准，拼接文本时该 chunk 的空 content 不影响结果
         """
+        if stream or not self._dedupe:
+            return self._send(messages, stream, include_raw)
+        return self._inflight.do(request_key(messages), lambda: self._send(messages, False))
+
+    def _send(
+        self,
+        messages: list[dict[str, Any]],
+        stream: bool,
+        include_raw: bool = False,
+    ) -> dict[str, Any] | Iterator[dict[str, Any]]:
+        """按消息类型选择 API 并发送"""
         if self._is_multimodal(messages):
-            return self._chat_multimodal(messages, stream)
+            return self._chat_multimodal(messages, stream, include_raw)
         else:
-            return self._chat_text(messages, stream)
+            return self._chat_text(messages, stream, include_raw)
 
     def _chat_text(
         self,
         messages: list[dict[str, Any]],
         stream: bool = False,
+        include_raw: bool = False,
     ) -> dict[str, Any] | Iterator[dict[str, Any]]:
         """纯文本对话 - 使用 Generation API"""
-        from dashscope import Generation
-
         params = self._build_params(messages)
 
         if stream:
             params["stream"] = True
             params["incremental_output"] = True
-            responses = Generation.call(**params)
-            return self._handle_stream(responses)
+            responses = self._generation.call(**params)
+            return coalesce_stream(
+                self._handle_stream(responses, include_raw), self.config.stream_coalesce_ms
+            )
         else:
-            response = Generation.call(**params)
-            return self._handle_response(response)
+            response = self._generation.call(**params)
+            result = self._handle_response(response)
+            return attach_parsed(result) if self.config.structured_output.enabled else result
 
     def _chat_multimodal(
         self,
         messages: list[dict[str, Any]],
         stream: bool = False,
+        include_raw: bool = False,
     ) -> dict[str, Any] | Iterator[dict[str, Any]]:
         """多模态对话 - 使用 MultiModalConversation API"""
-        from dashscope import MultiModalConversation
+        model_id = self.model_id
+        if not model_id.startswith("qwen-vl"):
+            model_id = "qwen-vl-max"
+
+        if stream:
+            responses = self._multimodal_conversation.call(
+                model=model_id,
+                messages=messages,
+                stream=True,
+                incremental_output=True,
+            )
+            return coalesce_stream(
+                self._handle_multimodal_stream(responses, include_raw),
+                self.config.stream_coalesce_ms,
+            )
+        else:
+            response = self._multimodal_conversation.call(
+                model=model_id,
+                messages=messages,
+            )
+            result = self._handle_multimodal_response(response)
+            return attach_parsed(result) if self.config.structured_output.enabled else result
+
+    async def achat(
+        self,
+        messages: list[dict[str, Any]],
+        stream: bool = False,
+        include_raw: bool = False,
+    ) -> dict[str, Any] | AsyncIterator[dict[str, Any]]:
+        """
+        异步发送聊天请求 (流式时返回异步迭代器)
+
+        与 chat() 相同地按消息类型选择 API，并合并相同的在途非流式请求；
+        流式输出格式与 chat() 相同 (usage 只在额外的收尾 chunk 上)。
+        """
+        if stream or not self._dedupe:
+            return await self._asend(messages, stream, include_raw)
+        return await self._ainflight.do(request_key(messages), lambda: self._asend(messages, False))
+
+    async def _asend(
+        self,
+        messages: list[dict[str, Any]],
+        stream: bool,
+        include_raw: bool = False,
+    ) -> dict[str, Any] | AsyncIterator[dict[str, Any]]:
+        """按消息类型选择异步 API 并发送"""
+        if self._is_multimodal(messages):
+            return await self._achat_multimodal(messages, stream, include_raw)
+        else:
+            return await self._achat_text(messages, stream, include_raw)
+
+    async def _achat_text(
+        self,
+        messages: list[dict[str, Any]],
+        stream: bool = False,
+        include_raw: bool = False,
+    ) -> dict[str, Any] | AsyncIterator[dict[str, Any]]:
+        """纯文本对话 - 使用 AioGeneration API"""
+        if self._aio_generation is None:
+            return await self._achat_in_thread(self._chat_text, messages, stream, include_raw)
+
+        params = self._build_params(messages)
+
+        if stream:
+            params["stream"] = True
+            params["incremental_output"] = True
+            responses = await self._aio_generation.call(**params)
+            return acoalesce_stream(
+                self._ahandle_stream(responses, include_raw), self.config.stream_coalesce_ms
+            )
+        else:
+            response = await self._aio_generation.call(**params)
+            result = self._handle_response(response)
+            return attach_parsed(result) if self.config.structured_output.enabled else result
+
+    async def _achat_multimodal(
+        self,
+        messages: list[dict[str, Any]],
+        stream: bool = False,
+        include_raw: bool = False,
+    ) -> dict[str, Any] | AsyncIterator[dict[str, Any]]:
+        """多模态对话 - 使用 AioMultiModalConversation API"""
+        if self._aio_multimodal_conversation is None:
+            return await self._achat_in_thread(self._chat_multimodal, messages, stream, include_raw)
 
         model_id = self.model_id
         if not model_id.startswith("qwen-vl"):
             model_id = "qwen-vl-max"
 
         if stream:
-            responses = MultiModalConversation.call(
+            responses = await self._aio_multimodal_conversation.call(
                 model=model_id,
                 messages=messages,
                 stream=True,
                 incremental_output=True,
             )
-            return self._handle_multimodal_stream(responses)
+            return acoalesce_stream(
+                self._ahandle_multimodal_stream(responses, include_raw),
+                self.config.stream_coalesce_ms,
+            )
         else:
-            response = MultiModalConversation.call(
+            response = await self._aio_multimodal_conversation.call(
                 model=model_id,
                 messages=messages,
             )
-            return self._handle_multimodal_response(response)
+            result = self._handle_multimodal_response(response)
+            return attach_parsed(result) if self.config.structured_output.enabled else result
+
+    @staticmethod
+    async def _achat_in_thread(
+        send: Any,
+        messages: list[dict[str, Any]],
+        stream: bool,
+        include_raw: bool,
+    ) -> dict[str, Any] | AsyncIterator[dict[str, Any]]:
+        """在线程池中执行同步请求 (流式时逐个 chunk 在线程池中读取)"""
+        response = await asyncio.to_thread(send, messages, stream, include_raw)
+        if stream:
+            return _iterate_in_thread(response)
+        return cast(dict[str, Any], response)
+
+    async def achat_many(
+        self,
+        messages_list: list[list[dict[str, Any]]],
+        max_concurrency: int = 32,
+    ) -> list[dict[str, Any]]:
+        """
+        并发发送多组聊天请求 (非流式)
+
+        Args:
+            messages_list: 多组互相独立的消息列表
+            max_concurrency: 同时在途的最大请求数
+
+        Returns:
+            与 messages_list 一一对应的响应列表
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _run(messages: list[dict[str, Any]]) -> dict[str, Any]:
+            async with semaphore:
+                return cast(dict[str, Any], await self.achat(messages))
+
+        return list(await asyncio.gather(*(_run(messages) for messages in messages_list)))
+
+    def chat_batch(
+        self,
+        prompts: list[str],
+        system: str | None = None,
+    ) -> list[Any]:
+        """
+        批量处理多个独立 prompt (单次请求)
+
+        将 N 个 prompt 编号合并为一条消息并要求 JSON 输出，再按编号拆回结果，
+        用 1 次 HTTP 往返替代 N 次，共享的 system 前缀也只计费一次。
+        适用于分类、打标、短摘要等互不依赖的小任务。
+
+        Args:
+            prompts: 待处理的 prompt 列表
+            system: 所有 prompt 共享的 system 指令（可选）
+
+        Returns:
+            与 prompts 一一对应的结果列表
+        """
+        if not prompts:
+            return []
+
+        messages: list[dict[str, Any]] = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": self._build_batched_prompt(prompts)})
+
+        params = self._build_params(messages)
+        params["response_format"] = {"type": "json_object"}
+        result = self._handle_response(self._generation.call(**params))
+        return self._parse_batched_output(result["content"], len(prompts))
+
+    @staticmethod
+    def _build_batched_prompt(prompts: list[str]) -> str:
+        """构建批量 prompt: 按编号枚举各任务，并约定 JSON 输出格式"""
+        sections = [f"### Tuple {i}\n{prompt}" for i, prompt in enumerate(prompts, start=1)]
+        instruction = (
+            f"Answer each of the {len(prompts)} tuples above independently. "
+            'Return a JSON object {"results": [{"id": <tuple number>, "output": <answer>}, ...]} '
+            "with exactly one element per tuple, where id is the tuple number."
+        )
+        return "\n\n".join([*sections, instruction])
+
+    @staticmethod
+    def _parse_batched_output(text: str, expected: int) -> list[Any]:
+        """解析批量输出，按 tuple 编号还原顺序（防止模型打乱顺序）"""
+        try:
+            items = loads(text)["results"]
+            outputs = {int(item["id"]): item["output"] for item in items}
+        except (ValueError, KeyError, TypeError) as e:
+            raise RuntimeError(f"DashScope batch response is not valid JSON: {text!r}") from e
+
+        missing = [i for i in range(1, expected + 1) if i not in outputs]
+        if missing:
+            raise RuntimeError(f"DashScope batch response missing tuples: {missing}")
+
+        return [outputs[i] for i in range(1, expected + 1)]
 
     def _handle_multimodal_response(self, response: Any) -> dict[str, Any]:
         """处理多模态非流式响应"""
@@ -172,97 +523,268 @@ class DashScopeModel:
             raise RuntimeError(f"DashScope API error: {response.code} - {response.message}")
 
         content = response.output.choices[0].message.content
-        if isinstance(content, list):
-            text = "".join([c.get("text", "") for c in content if isinstance(c, dict)])
-        else:
-            text = content
+        text = _join_text_parts(content) if isinstance(content, list) else content
 
+        # 多模态 usage 字段不固定 (可能缺少 total_tokens)，保留默认值
+        usage = response.usage
         return {
             "content": text,
             "usage": {
-                "prompt_tokens": getattr(response.usage, "input_tokens", 0),
-                "completion_tokens": getattr(response.usage, "output_tokens", 0),
-                "total_tokens": getattr(response.usage, "total_tokens", 0),
+                "prompt_tokens": getattr(usage, "input_tokens", 0),
+                "completion_tokens": getattr(usage, "output_tokens", 0),
+                "total_tokens": getattr(usage, "total_tokens", 0),
             },
             "raw": response,
         }
 
-    def _handle_multimodal_stream(self, responses: Any) -> Iterator[dict[str, Any]]:
+    def _handle_multimodal_stream(
+        self, responses: Any, include_raw: bool = False
+    ) -> Iterator[dict[str, Any]]:
         """处理多模态流式响应"""
         for response in responses:
             if response.status_code != 200:
                 raise RuntimeError(f"DashScope API error: {response.code} - {response.message}")
 
             content = response.output.choices[0].message.content
-            if isinstance(content, list):
-                text = "".join([c.get("text", "") for c in content if isinstance(c, dict)])
+            text = _join_text_parts(content) if isinstance(content, list) else content or ""
+
+            if include_raw:
+                yield {"content": text, "raw": response}
             else:
-                text = content or ""
+                yield {"content": text}
 
-            yield {
-                "content": text,
-                "raw": response,
-            }
+    async def _ahandle_multimodal_stream(
+        self, responses: Any, include_raw: bool = False
+    ) -> AsyncIterator[dict[str, Any]]:
+        """处理多模态异步流式响应"""
+        async for response in responses:
+            if response.status_code != 200:
+                raise RuntimeError(f"DashScope API error: {response.code} - {response.message}")
+
+            content = response.output.choices[0].message.content
+            text = _join_text_parts(content) if isinstance(content, list) else content or ""
+
+            if include_raw:
+                yield {"content": text, "raw": response}
+            else:
+                yield {"content": text}
 
     def _handle_response(self, response: Any) -> dict[str, Any]:
         """处理非流式响应"""
         if response.status_code != 200:
             raise RuntimeError(f"DashScope API error: {response.code} - {response.message}")
 
+        output = response.output
+        prompt_tokens, completion_tokens, total_tokens = _usage_fields(response.usage)
         return {
-            "content": response.output.text
-            if hasattr(response.output, "text")
-            else response.output.choices[0].message.content,
+            "content": output.text
+            if hasattr(output, "text")
+            else output.choices[0].message.content,
             "usage": {
-                "prompt_tokens": response.usage.input_tokens,
-                "completion_tokens": response.usage.output_tokens,
-                "total_tokens": response.usage.total_tokens,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens,
             },
             "raw": response,
         }
 
-    def _handle_stream(self, responses: Any) -> Iterator[dict[str, Any]]:
-        """处理流式响应"""
+    def _handle_stream(self, responses: Any, include_raw: bool = False) -> Iterator[dict[str, Any]]:
+        """
+        处理流式响应
+
+        增量 chunk 只包含 content (include_raw 时附带 raw)，不含 usage 键；
+        usage 在流结束后以一个额外的 {"content": "", "usage": {...}} 收尾 chunk 单独产出
+        (DashScope 的 usage 为累计值，只有最后一次才有意义)，避免每个 token 都构造 usage 字典。
+        调用方需要 usage 时读取带 "usage" 键的 chunk，不能再从任意增量 chunk 上读取。
+        同一个流内 output 结构不变，文本提取方式根据首个 chunk 确定一次。
+        """
+        extract = None
+        last = None
         for response in responses:
             if response.status_code != 200:
                 raise RuntimeError(f"DashScope API error: {response.code} - {response.message}")
 
-            content = ""
-            if hasattr(response.output, "text"):
-                content = response.output.text
-            elif hasattr(response.output, "choices") and response.output.choices:
-                content = response.output.choices[0].message.content
-
-            yield {
-                "content": content,
-                "usage": {
-                    "prompt_tokens": getattr(response.usage, "input_tokens", 0),
-                    "completion_tokens": getattr(response.usage, "output_tokens", 0),
-                },
-                "raw": response,
-            }
+            if extract is None:
+                extract = _output_text if hasattr(response.output, "text") else _choice_content
+
+            last = response
+            if include_raw:
+                yield {"content": extract(response.output), "raw": response}
+            else:
+                yield {"content": extract(response.output)}
+
+        if last is not None:
+            yield self._final_chunk(last, include_raw)
+
+    async def _ahandle_stream(
+        self, responses: Any, include_raw: bool = False
+    ) -> AsyncIterator[dict[str, Any]]:
+        """处理异步流式响应 (产出方式与 _handle_stream 相同，usage 只在额外的收尾 chunk 上)"""
+        extract = None
+        last = None
+        async for response in responses:
+            if response.status_code != 200:
+                raise RuntimeError(f"DashScope API error: {response.code} - {response.message}")
+
+            if extract is None:
+                extract = _output_text if hasattr(response.output, "text") else _choice_content
+
+            last = response
+            if include_raw:
+                yield {"content": extract(response.output), "raw": response}
+            else:
+                yield {"content": extract(response.output)}
+
+        if last is not None:
+            yield self._final_chunk(last, include_raw)
+
+    @staticmethod
+    def _final_chunk(last: Any, include_raw: bool) -> dict[str, Any]:
+        """构建携带 usage 的流式收尾 chunk"""
+        usage = last.usage
+        final: dict[str, Any] = {
+            "content": "",
+            "usage": {
+                "prompt_tokens": getattr(usage, "input_tokens", 0),
+                "completion_tokens": getattr(usage, "output_tokens", 0),
+            },
+        }
+        if include_raw:
+            final["raw"] = last
+        return final
 
     def _get_openai_client(self) -> Any:
-        """获取 OpenAI 兼容客户端"""
-        try:
-            from openai import OpenAI
-        except ImportError as e:
-            raise ImportError("openai package not found. Install with: pip install openai") from e
+        """获取 OpenAI 兼容客户端 (首次调用时创建，之后复用)"""
+        if self._openai_client is None:
+            try:
+                from openai import OpenAI
+            except ImportError as e:
+                raise ImportError(
+                    "openai package not found. Install with: pip install openai"
+                ) from e
+
+            self._openai_client = OpenAI(
+                api_key=self.api_key,
+                base_url=_COMPATIBLE_BASE_URL,
+                http_client=shared_http_client(),
+            )
+        return self._openai_client
+
+    def _get_async_openai_client(self) -> Any:
+        """获取当前事件循环的 AsyncOpenAI 兼容客户端 (同一循环内复用；需在协程中调用)"""
+        loop = asyncio.get_running_loop()
+        client = self._async_openai_clients.get(loop)
+        if client is None:
+            try:
+                from openai import AsyncOpenAI
+            except ImportError as e:
+                raise ImportError(
+                    "openai package not found. Install with: pip install openai"
+                ) from e
+
+            client = self._async_openai_clients[loop] = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=_COMPATIBLE_BASE_URL,
+                http_client=shared_async_http_client(),
+            )
+        return client
 
-        return OpenAI(
-            api_key=self.api_key,
-            base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-        )
+    def close(self) -> None:
+        """
+        释放 OpenAI 兼容客户端
+
+        客户端使用共享的 httpx 连接池 (见 _pool)，这里只丢弃引用、不关闭连接池；
+        异步连接池在应用关闭时通过 aclose_shared_http_client() 关闭。
+        """
+        self._openai_client = None
+        self._async_openai_clients.clear()
+
+    async def aclose(self) -> None:
+        """异步版 close()"""
+        self.close()
+
+    def __enter__(self) -> "DashScopeModel":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "DashScopeModel":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
 
     def upload_file(self, file_path: str) -> str:
-        """上传文件到 DashScope (用于 qwen-long 文档理解)"""
-        client = self._get_openai_client()
+        """
+        上传文件到 DashScope (用于 qwen-long 文档理解)
 
-        with open(file_path, "rb") as f:
-            file_object = client.files.create(file=f, purpose="file-extract")
+        内容相同的文件 (sha256 一致) 在有效期内复用之前上传得到的 file_id，不重复上传；
+        文件未变化 (路径、mtime、大小一致) 时也不重新计算 sha256。
+        """
+        digest = self._file_digest(file_path)
+        if (file_id := self._cached_file_id(digest)) is not None:
+            return file_id
+
+        file_id = self._upload(file_path)
+        self._remember_file_id(digest, file_id)
+        return file_id
+
+    async def aupload_file(self, file_path: str) -> str:
+        """
+        异步版 upload_file
 
-        logger.info("Uploaded file to DashScope: %s -> %s", file_path, file_object.id)
-        return file_object.id
+        计算 sha256 和上传都在线程池中执行: multipart 上传会同步读取文件，
+        放在事件循环上会阻塞其他协程 (AsyncOpenAI 同样是同步读取文件对象)。
+        """
+        digest = await asyncio.to_thread(self._file_digest, file_path)
+        if (file_id := self._cached_file_id(digest)) is not None:
+            return file_id
+
+        file_id = await asyncio.to_thread(self._upload, file_path)
+        self._remember_file_id(digest, file_id)
+        return file_id
+
+    def _upload(self, file_path: str) -> str:
+        """上传文件并返回 file_id (不查缓存；文件读取和网络请求均为同步阻塞)"""
+        # 直接传文件对象: SDK 原样交给 httpx multipart 分块读取上传，
+        # 不要改成 f.read() (大文件会整块读入内存)
+        with open(file_path, "rb") as f:
+            file_object = self._get_openai_client().files.create(file=f, purpose="file-extract")
+
+        logger.debug("Uploaded file to DashScope: %s -> %s", file_path, file_object.id)
+        return cast(str, file_object.id)
+
+    def _file_digest(self, file_path: str) -> str:
+        """获取文件内容的 sha256 (按路径、mtime、大小缓存，文件未变化时不重新读取)"""
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+        digest = self._file_digests.get(key)
+        if digest is None:
+            digest = self._file_digests[key] = _file_digest(file_path)
+            if len(self._file_digests) > _FILE_ID_CACHE_SIZE:
+                self._file_digests.popitem(last=False)
+        return digest
+
+    def _cached_file_id(self, digest: str) -> str | None:
+        """获取有效期内已上传文件的 file_id (过期则丢弃)"""
+        entry = self._file_ids.get(digest)
+        if entry is None:
+            return None
+
+        file_id, uploaded_at = entry
+        if time.monotonic() - uploaded_at >= _FILE_ID_TTL:
+            del self._file_ids[digest]
+            return None
+
+        self._file_ids.move_to_end(digest)
+        return file_id
+
+    def _remember_file_id(self, digest: str, file_id: str) -> None:
+        """记录已上传文件的 file_id (超出上限时淘汰最久未使用的)"""
+        self._file_ids[digest] = (file_id, time.monotonic())
+        if len(self._file_ids) > _FILE_ID_CACHE_SIZE:
+            self._file_ids.popitem(last=False)
 
     def chat_with_file(
         self,
@@ -271,22 +793,47 @@ class DashScopeModel:
         model_id: str | None = None,
     ) -> dict[str, Any]:
         """使用 qwen-long 处理已上传的文件"""
-        client = self._get_openai_client()
+        if not self._dedupe:
+            return self._chat_with_file(file_id, query, model_id)
+        return self._inflight.do(
+            request_key("file", file_id, query, model_id),
+            lambda: self._chat_with_file(file_id, query, model_id),
+        )
 
-        response = client.chat.completions.create(
+    def _chat_with_file(
+        self,
+        file_id: str,
+        query: str,
+        model_id: str | None,
+    ) -> dict[str, Any]:
+        response = self._get_openai_client().chat.completions.create(
             model=model_id or "qwen-long",
-            messages=[
-                {"role": "system", "content": f"fileid://{file_id}"},
-                {"role": "user", "content": query},
-            ],
+            messages=_file_messages(file_id, query),
         )
+        return self._handle_file_response(response)
 
+    async def _achat_with_file(
+        self,
+        file_id: str,
+        query: str,
+        model_id: str | None,
+    ) -> dict[str, Any]:
+        response = await self._get_async_openai_client().chat.completions.create(
+            model=model_id or "qwen-long",
+            messages=_file_messages(file_id, query),
+        )
+        return self._handle_file_response(response)
+
+    @staticmethod
+    def _handle_file_response(response: Any) -> dict[str, Any]:
+        """处理 OpenAI 兼容接口的文件对话响应"""
+        prompt_tokens, completion_tokens, total_tokens = _openai_usage_fields(response.usage)
         return {
             "content": response.choices[0].message.content,
             "usage": {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens,
             },
             "raw": response,
         }
@@ -301,6 +848,64 @@ class DashScopeModel:
         file_id = self.upload_file(file_path)
         return self.chat_with_file(file_id, query, model_id)
 
+    async def achat_with_file(
+        self,
+        file_id: str,
+        query: str,
+        model_id: str | None = None,
+    ) -> dict[str, Any]:
+        """异步版 chat_with_file (使用 AsyncOpenAI)"""
+        if not self._dedupe:
+            return await self._achat_with_file(file_id, query, model_id)
+        return await self._ainflight.do(
+            request_key("file", file_id, query, model_id),
+            lambda: self._achat_with_file(file_id, query, model_id),
+        )
+
+    async def achat_with_pdf(
+        self,
+        file_path: str,
+        query: str,
+        model_id: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        异步版 chat_with_pdf
+
+        上传 (含 sha256 去重) 与提问都不阻塞事件循环，
+        多个文档的 achat_with_pdf 可通过 asyncio.gather 并发进行。
+        """
+        file_id = await self.aupload_file(file_path)
+        return await self.achat_with_file(file_id, query, model_id)
+
+    async def achat_with_pdfs(
+        self,
+        items: list[tuple[str, str]],
+        model_id: str | None = None,
+        max_concurrency: int = 8,
+    ) -> list[dict[str, Any] | BaseException]:
+        """
+        并发处理多个文档问答 (每个文档上传后提问)
+
+        Args:
+            items: (文件路径, 问题) 列表
+            model_id: 文档理解模型（默认 qwen-long）
+            max_concurrency: 同时处理的最大文档数
+
+        Returns:
+            与 items 一一对应的结果；单个文档失败时对应位置为异常对象，不影响其他文档
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _run(file_path: str, query: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self.achat_with_pdf(file_path, query, model_id)
+
+        return list(
+            await asyncio.gather(
+                *(_run(file_path, query) for file_path, query in items), return_exceptions=True
+            )
+        )
+
 
 class DashScopeAdapter(BaseModelAdapter):
     """DashScope 适配器"""
@@ -5,10 +5,16 @@ Gateway 适配器 (OpenRouter / LiteLLM)
 """
 
 import logging
-import os
+from collections.abc import Callable
+from functools import cache
 from typing import TYPE_CHECKING
 
-from app.models.adapters.base import BaseModelAdapter
+from app.models.adapters.base import (
+    BaseModelAdapter,
+    load_model_class,
+    resolve_env,
+    select_params,
+)
 from app.models.config import ModelConfig, ModelProvider, ProjectConfig
 
 if TYPE_CHECKING:
@@ -16,6 +22,17 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# (ModelConfig 字段名, LiteLLM 参数名)：通用采样参数
+_LITELLM_PARAM_MAP = (
+    ("temperature", "temperature"),
+    ("max_tokens", "max_tokens"),
+    ("top_p", "top_p"),
+    ("frequency_penalty", "frequency_penalty"),
+    ("presence_penalty", "presence_penalty"),
+    ("seed", "seed"),
+    ("stop", "stop"),
+)
+
 
 class GatewayAdapter(BaseModelAdapter):
     """
@@ -34,6 +51,12 @@ class GatewayAdapter(BaseModelAdapter):
         provider_name = "OpenRouter" if gateway_type == "openrouter" else "LiteLLM"
         super().__init__(provider_id, provider_name)
         self.gateway_type = gateway_type
+        # 按类型绑定构建方法，create_model 时直接调用
+        builders: dict[str, Callable[[ModelConfig, str | None], Model]] = {
+            "openrouter": self._create_openrouter,
+            "litellm": self._create_litellm,
+        }
+        self._build = builders.get(gateway_type)
 
     def create_model(
         self,
@@ -41,21 +64,15 @@ class GatewayAdapter(BaseModelAdapter):
         project_config: ProjectConfig | None = None,
     ) -> "Model":
         """创建 Gateway 模型实例"""
-        api_key = self.get_api_key(config, project_config)
-
-        if self.gateway_type == "openrouter":
-            return self._create_openrouter(config, api_key)
-        elif self.gateway_type == "litellm":
-            return self._create_litellm(config, api_key)
-        else:
+        if self._build is None:
             raise ValueError(f"Unsupported gateway type: {self.gateway_type}")
 
+        api_key = self.get_api_key(config, project_config)
+        return self._build(config, api_key)
+
     def _create_openrouter(self, config: ModelConfig, api_key: str | None) -> "Model":
         """创建 OpenRouter 模型"""
-        try:
-            from agno.models.openrouter import OpenRouter
-        except ImportError as e:
-            raise ImportError("agno package not found. Install with: pip install agno") from e
+        OpenRouter = load_model_class("agno.models.openrouter", "OpenRouter", "agno")
 
         if not api_key:
             raise ValueError(f"OpenRouter API Key not found. Set: {self.default_env_var}")
@@ -66,10 +83,7 @@ class GatewayAdapter(BaseModelAdapter):
 
     def _create_litellm(self, config: ModelConfig, api_key: str | None) -> "Model":
         """创建 LiteLLM 模型"""
-        try:
-            from agno.models.litellm import LiteLLM
-        except ImportError as e:
-            raise ImportError("litellm package not found. Install with: pip install litellm") from e
+        LiteLLM = load_model_class("agno.models.litellm", "LiteLLM", "litellm")
 
         params = {"id": config.model_id}
         if api_key:
@@ -81,20 +95,7 @@ class GatewayAdapter(BaseModelAdapter):
             params["api_base"] = api_base
 
         # 通用参数
-        if config.temperature is not None:
-            params["temperature"] = config.temperature
-        if config.max_tokens is not None:
-            params["max_tokens"] = config.max_tokens
-        if config.top_p is not None:
-            params["top_p"] = config.top_p
-        if config.frequency_penalty is not None:
-            params["frequency_penalty"] = config.frequency_penalty
-        if config.presence_penalty is not None:
-            params["presence_penalty"] = config.presence_penalty
-        if config.seed is not None:
-            params["seed"] = config.seed
-        if config.stop:
-            params["stop"] = config.stop
+        params.update(select_params(config, _LITELLM_PARAM_MAP))
 
         # 结构化输出
         if config.structured_output.enabled:
@@ -114,23 +115,20 @@ class GatewayAdapter(BaseModelAdapter):
         return LiteLLM(**params)
 
     def _get_litellm_api_base(self, config: ModelConfig) -> str | None:
-        """获取 LiteLLM API Base URL"""
-        if config.litellm_api_base_env:
-            api_base = os.environ.get(config.litellm_api_base_env)
-            if api_base:
-                return api_base
-
-        if config.litellm_api_base:
-            return config.litellm_api_base
-
-        return os.environ.get("LITELLM_API_BASE")
+        """获取 LiteLLM API Base URL (config.litellm_api_base_env -> config.litellm_api_base -> LITELLM_API_BASE)"""
+        return (
+            resolve_env(config.litellm_api_base_env)
+            or config.litellm_api_base
+            or resolve_env("LITELLM_API_BASE")
+        )
 
 
+@cache
 def create_gateway_adapter(provider: ModelProvider) -> GatewayAdapter:
-    """工厂函数：根据 Provider 创建 Gateway 适配器"""
-    if provider == ModelProvider.OPENROUTER:
+    """工厂函数：根据 Provider 获取 Gateway 适配器 (适配器无状态，同一 Provider 复用同一实例)"""
+    if provider is ModelProvider.OPENROUTER:
         return GatewayAdapter("openrouter")
-    elif provider == ModelProvider.LITELLM:
+    elif provider is ModelProvider.LITELLM:
         return GatewayAdapter("litellm")
     else:
         raise ValueError(f"Provider {provider} is not a gateway type")
@@ -5,10 +5,16 @@ Native 适配器 (OpenAI / Google / Anthropic / Ollama)
 """
 
 import logging
-import os
+from collections.abc import Callable
+from functools import cache
 from typing import TYPE_CHECKING, Any
 
-from app.models.adapters.base import BaseModelAdapter
+from app.models.adapters.base import (
+    BaseModelAdapter,
+    load_model_class,
+    resolve_env,
+    select_params,
+)
 from app.models.config import ModelConfig, ModelProvider, ProjectConfig
 
 if TYPE_CHECKING:
@@ -16,6 +22,32 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# (ModelConfig 字段名, SDK 参数名)：各厂商通用采样参数的命名映射
+_GOOGLE_PARAM_MAP = (
+    ("temperature", "temperature"),
+    ("max_tokens", "max_output_tokens"),
+    ("top_p", "top_p"),
+    ("top_k", "top_k"),
+    ("stop", "stop_sequences"),
+)
+_ANTHROPIC_PARAM_MAP = (
+    ("temperature", "temperature"),
+    ("max_tokens", "max_tokens"),
+    ("top_p", "top_p"),
+    ("top_k", "top_k"),
+    ("stop", "stop_sequences"),
+)
+# Ollama 的采样参数和运行参数放在 options 中
+_OLLAMA_OPTION_MAP = (
+    ("temperature", "temperature"),
+    ("top_p", "top_p"),
+    ("top_k", "top_k"),
+    ("ollama_num_ctx", "num_ctx"),
+    ("ollama_num_batch", "num_batch"),
+    ("ollama_num_thread", "num_thread"),
+    ("ollama_num_gpu", "num_gpu"),
+)
+
 
 class NativeAdapter(BaseModelAdapter):
     """
@@ -37,6 +69,14 @@ class NativeAdapter(BaseModelAdapter):
         }
         super().__init__(native_type, provider_names.get(native_type, native_type))
         self.native_type = native_type
+        # 按类型绑定构建方法，create_model 时直接调用
+        builders: dict[str, Callable[[ModelConfig, str | None], Model]] = {
+            "openai": self._create_openai,
+            "google": self._create_google,
+            "anthropic": self._create_anthropic,
+            "ollama": self._create_ollama,
+        }
+        self._build = builders.get(native_type)
 
     def create_model(
         self,
@@ -44,25 +84,15 @@ class NativeAdapter(BaseModelAdapter):
         project_config: ProjectConfig | None = None,
     ) -> "Model":
         """创建 Native 模型实例"""
-        api_key = self.get_api_key(config, project_config)
-
-        if self.native_type == "openai":
-            return self._create_openai(config, api_key)
-        elif self.native_type == "google":
-            return self._create_google(config, api_key)
-        elif self.native_type == "anthropic":
-            return self._create_anthropic(config, api_key)
-        elif self.native_type == "ollama":
-            return self._create_ollama(config, project_config)
-        else:
+        if self._build is None:
             raise ValueError(f"Unsupported native type: {self.native_type}")
 
+        api_key = self.get_api_key(config, project_config)
+        return self._build(config, api_key)
+
     def _create_openai(self, config: ModelConfig, api_key: str | None) -> "Model":
         """创建 OpenAI 模型"""
-        try:
-            from agno.models.openai import OpenAIChat
-        except ImportError as e:
-            raise ImportError("agno package not found. Install with: pip install agno") from e
+        OpenAIChat = load_model_class("agno.models.openai", "OpenAIChat", "agno")
 
         if not api_key:
             raise ValueError(f"OpenAI API Key not found. Set: {self.default_env_var}")
@@ -85,12 +115,7 @@ class NativeAdapter(BaseModelAdapter):
 
     def _create_google(self, config: ModelConfig, api_key: str | None) -> "Model":
         """创建 Google Gemini 模型"""
-        try:
-            from agno.models.google import Gemini
-        except ImportError as e:
-            raise ImportError(
-                "google-genai package not found. Install with: pip install google-genai"
-            ) from e
+        Gemini = load_model_class("agno.models.google", "Gemini", "google-genai")
 
         if not api_key:
             raise ValueError(f"Google API Key not found. Set: {self.default_env_var}")
@@ -98,16 +123,7 @@ class NativeAdapter(BaseModelAdapter):
         params: dict[str, Any] = {"id": config.model_id}
 
         # 通用参数
-        if config.temperature is not None:
-            params["temperature"] = config.temperature
-        if config.max_tokens is not None:
-            params["max_output_tokens"] = config.max_tokens
-        if config.top_p is not None:
-            params["top_p"] = config.top_p
-        if config.top_k is not None:
-            params["top_k"] = config.top_k
-        if config.stop:
-            params["stop_sequences"] = config.stop
+        params.update(select_params(config, _GOOGLE_PARAM_MAP))
 
         # Reasoning (Gemini 思考模式)
         if config.reasoning.enabled:
@@ -133,12 +149,7 @@ class NativeAdapter(BaseModelAdapter):
 
     def _create_anthropic(self, config: ModelConfig, api_key: str | None) -> "Model":
         """创建 Anthropic Claude 模型"""
-        try:
-            from agno.models.anthropic import Claude
-        except ImportError as e:
-            raise ImportError(
-                "anthropic package not found. Install with: pip install anthropic"
-            ) from e
+        Claude = load_model_class("agno.models.anthropic", "Claude", "anthropic")
 
         if not api_key:
             raise ValueError(f"Anthropic API Key not found. Set: {self.default_env_var}")
@@ -146,16 +157,7 @@ class NativeAdapter(BaseModelAdapter):
         params: dict[str, Any] = {"id": config.model_id}
 
         # 通用参数
-        if config.temperature is not None:
-            params["temperature"] = config.temperature
-        if config.max_tokens is not None:
-            params["max_tokens"] = config.max_tokens
-        if config.top_p is not None:
-            params["top_p"] = config.top_p
-        if config.top_k is not None:
-            params["top_k"] = config.top_k
-        if config.stop:
-            params["stop_sequences"] = config.stop
+        params.update(select_params(config, _ANTHROPIC_PARAM_MAP))
 
         # Extended Thinking (Anthropic 扩展思考)
         if config.reasoning.enabled:
@@ -165,29 +167,25 @@ class NativeAdapter(BaseModelAdapter):
             }
             params["thinking"] = thinking_config
 
+        # Prompt Caching (system prompt 前缀缓存)
+        if config.prompt_cache:
+            params["cache_system_prompt"] = True
+
         logger.info("Creating Anthropic Claude model: %s", config.model_id)
         return Claude(api_key=api_key, **params)
 
-    def _create_ollama(self, config: ModelConfig, project_config: ProjectConfig | None) -> "Model":
-        """创建 Ollama 模型"""
-        try:
-            from agno.models.ollama import Ollama
-        except ImportError as e:
-            raise ImportError("ollama package not found. Install with: pip install ollama") from e
+    def _create_ollama(self, config: ModelConfig, api_key: str | None) -> "Model":
+        """创建 Ollama 模型 (本地部署无需 API Key，api_key 仅为与其他构建方法签名一致)"""
+        Ollama = load_model_class("agno.models.ollama", "Ollama", "ollama")
 
         host = self._get_ollama_host(config)
         params: dict[str, Any] = {"id": config.model_id, "host": host}
 
-        # 通用参数
-        if config.temperature is not None:
-            params["options"] = params.get("options", {})
-            params["options"]["temperature"] = config.temperature
-        if config.top_p is not None:
-            params["options"] = params.get("options", {})
-            params["options"]["top_p"] = config.top_p
-        if config.top_k is not None:
-            params["options"] = params.get("options", {})
-            params["options"]["top_k"] = config.top_k
+        # 通用参数 (采样参数和运行参数放在 options 中)
+        if options := select_params(config, _OLLAMA_OPTION_MAP):
+            params["options"] = options
+        if config.ollama_keep_alive is not None:
+            params["keep_alive"] = config.ollama_keep_alive
         if config.stop:
             params["stop"] = config.stop
 
@@ -201,21 +199,13 @@ class NativeAdapter(BaseModelAdapter):
         return Ollama(**params)
 
     def _get_ollama_host(self, config: ModelConfig) -> str:
-        """获取 Ollama Host"""
-        if config.ollama_host_env:
-            host = os.environ.get(config.ollama_host_env)
-            if host:
-                return host
-
-        host = os.environ.get("OLLAMA_HOST")
-        if host:
-            return host
-
-        return config.ollama_host
+        """获取 Ollama Host (config.ollama_host_env -> OLLAMA_HOST -> config.ollama_host)"""
+        return resolve_env(config.ollama_host_env, "OLLAMA_HOST") or config.ollama_host
 
 
+@cache
 def create_native_adapter(provider: ModelProvider) -> NativeAdapter:
-    """工厂函数：根据 Provider 创建 Native 适配器"""
+    """工厂函数：根据 Provider 获取 Native 适配器 (适配器无状态，同一 Provider 复用同一实例)"""
     native_types = {
         ModelProvider.OPENAI: "openai",
         ModelProvider.GOOGLE: "google",
@@ -6,15 +6,183 @@
 特性: 联网搜索, 深度思考, 多模态
 """
 
+import asyncio
 import logging
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Iterator
+from functools import cache, lru_cache
+from operator import attrgetter
 from typing import Any
+from weakref import WeakKeyDictionary
 
-from app.models.adapters.base import BaseModelAdapter
+from app.models.adapters._json import attach_parsed
+from app.models.adapters._stream import acoalesce_stream, coalesce_stream
+from app.models.adapters.base import BaseModelAdapter, select_params
 from app.models.config import ModelConfig, ProjectConfig
 
 logger = logging.getLogger(__name__)
 
+_ARK_BASE_URL = "https://ark.cn-beijing.volces.com/api/v3"
+_ARK_TIMEOUT = 1800
+
+_usage_fields = attrgetter("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+@cache
+def _ark_cls() -> Any:
+    """导入 Ark 客户端类 (首次调用时导入，之后直接返回缓存结果)"""
+    try:
+        from volcenginesdkarkruntime import Ark
+    except ImportError as e:
+        raise ImportError(
+            "volcenginesdkarkruntime package not found. "
+            "Install with: pip install volcengine-python-sdk[ark]"
+        ) from e
+    return Ark
+
+
+@lru_cache(maxsize=32)
+def _get_ark_client(api_key: str, base_url: str, timeout: int) -> Any:
+    """获取 Ark 客户端 (相同凭证的模型实例共享同一个客户端及其连接池)"""
+    return _ark_cls()(api_key=api_key, base_url=base_url, timeout=timeout)
+
+
+@cache
+def _async_ark_cls() -> Any:
+    """导入 AsyncArk 客户端类 (首次调用时导入，之后直接返回缓存结果)"""
+    try:
+        from volcenginesdkarkruntime import AsyncArk
+    except ImportError as e:
+        raise ImportError(
+            "volcenginesdkarkruntime package not found. "
+            "Install with: pip install volcengine-python-sdk[ark]"
+        ) from e
+    return AsyncArk
+
+
+# 事件循环 -> {(api_key, base_url, timeout): AsyncArk} (异步连接池绑定创建它的事件循环)
+_async_ark_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[Any, ...], Any]] = (
+    WeakKeyDictionary()
+)
+
+
+def _get_async_ark_client(api_key: str, base_url: str, timeout: int) -> Any:
+    """获取当前事件循环的 AsyncArk 客户端 (同一循环内相同凭证共享；需在协程中调用)"""
+    clients = _async_ark_clients.setdefault(asyncio.get_running_loop(), {})
+    key = (api_key, base_url, timeout)
+    client = clients.get(key)
+    if client is None:
+        client = clients[key] = _async_ark_cls()(
+            api_key=api_key, base_url=base_url, timeout=timeout
+        )
+    return client
+
+
+def _stream_chunk(chunk: Any, include_raw: bool = False) -> dict[str, Any] | None:
+    """将一个流式 chunk 转换为结果 dict (无 choices 的 chunk 返回 None)"""
+    if not chunk.choices:
+        return None
+
+    delta = chunk.choices[0].delta
+
+    result: dict[str, Any] = {"content": delta.content or ""}
+    if include_raw:
+        result["raw"] = chunk
+
+    if reasoning := getattr(delta, "reasoning_content", None):
+        result["reasoning"] = reasoning
+
+    return result
+
+
+# (ModelConfig 字段名, 方舟参数名)
+_PARAM_MAP = (
+    ("temperature", "temperature"),
+    ("max_tokens", "max_tokens"),
+    ("top_p", "top_p"),
+    ("frequency_penalty", "frequency_penalty"),
+    ("presence_penalty", "presence_penalty"),
+    ("stop", "stop"),
+)
+
+
+def _build_base_params(model_id: str, config: ModelConfig) -> dict[str, Any]:
+    """根据 config 构建与消息无关的固定参数"""
+    params: dict[str, Any] = {"model": model_id, **select_params(config, _PARAM_MAP)}
+
+    # 深度思考 (豆包 Seed 系列)
+    if config.reasoning.enabled:
+        params["thinking"] = {"type": config.reasoning.volcengine_thinking_type}
+
+    # 结构化输出
+    if config.structured_output.enabled:
+        if config.structured_output.response_type == "json_object":
+            params["response_format"] = {"type": "json_object"}
+        elif config.structured_output.json_schema:
+            params["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": config.structured_output.schema_name,
+                    "schema": config.structured_output.json_schema,
+                    "strict": config.structured_output.strict,
+                },
+            }
+
+    # 多模态图片限制
+    if config.multimodal.volcengine_max_pixels or config.multimodal.volcengine_min_pixels:
+        image_limit: dict[str, int] = {}
+        if config.multimodal.volcengine_max_pixels:
+            image_limit["max_pixels"] = config.multimodal.volcengine_max_pixels
+        if config.multimodal.volcengine_min_pixels:
+            image_limit["min_pixels"] = config.multimodal.volcengine_min_pixels
+        params["image_pixel_limit"] = image_limit
+
+    return params
+
+
+def _build_web_search_tools(config: ModelConfig) -> tuple[dict[str, Any], ...]:
+    """构建联网搜索工具 (元组，实例间只读共享，每次请求拼接成新列表)"""
+    web_search = config.web_search
+    if not web_search.enabled:
+        return ()
+
+    tool: dict[str, Any] = {
+        "type": "web_search",
+        "web_search": {
+            "enable": True,
+        },
+    }
+
+    if web_search.volcengine_max_keyword != 3:
+        tool["web_search"]["max_keyword"] = web_search.volcengine_max_keyword
+    if web_search.volcengine_limit != 10:
+        tool["web_search"]["limit"] = web_search.volcengine_limit
+    if web_search.volcengine_sources:
+        tool["web_search"]["sources"] = web_search.volcengine_sources
+
+    return (tool,)
+
+
+@lru_cache(maxsize=128)
+def _cached_static_params(
+    model_id: str, config: ModelConfig
+) -> tuple[dict[str, Any], tuple[dict[str, Any], ...]]:
+    return _build_base_params(model_id, config), _build_web_search_tools(config)
+
+
+def _static_params(
+    model_id: str, config: ModelConfig
+) -> tuple[dict[str, Any], tuple[dict[str, Any], ...]]:
+    """
+    按 (model_id, config) 缓存固定参数和联网搜索工具
+
+    结果在实例间共享且只读 (请求时展开为关键字参数，不会被修改)；
+    config 含 list/dict 字段 (如 stop、json_schema) 时不可哈希，退回直接构建。
+    """
+    try:
+        return _cached_static_params(model_id, config)
+    except TypeError:
+        return _build_base_params(model_id, config), _build_web_search_tools(config)
+
 
 class VolcengineModel:
     """
@@ -25,6 +193,7 @@ class VolcengineModel:
     - 深度思考: thinking.type = "auto" | "enabled"
     - 多模态: 支持图片 URL
     - 结构化输出: response_format
+    - 异步调用: achat() 使用 AsyncArk，不阻塞事件循环
     """
 
     def __init__(
@@ -33,158 +202,113 @@ class VolcengineModel:
         api_key: str,
         config: ModelConfig,
     ):
-        try:
-            from volcenginesdkarkruntime import Ark
-        except ImportError as e:
-            raise ImportError(
-                "volcenginesdkarkruntime package not found. "
-                "Install with: pip install volcengine-python-sdk[ark]"
-            ) from e
-
-        self.client = Ark(
-            api_key=api_key,
-            base_url="https://ark.cn-beijing.volces.com/api/v3",
-            timeout=1800,
-        )
+        self.api_key = api_key
+        self.client = _get_ark_client(api_key, _ARK_BASE_URL, _ARK_TIMEOUT)
         self.model_id = model_id
         self.config = config
-
-    def _build_params(self, messages: list[dict[str, Any]]) -> dict[str, Any]:
-        """构建火山方舟 API 参数"""
-        params: dict[str, Any] = {
-            "model": self.model_id,
-            "messages": messages,
-        }
-
-        # 通用参数
-        if self.config.temperature is not None:
-            params["temperature"] = self.config.temperature
-        if self.config.max_tokens is not None:
-            params["max_tokens"] = self.config.max_tokens
-        if self.config.top_p is not None:
-            params["top_p"] = self.config.top_p
-        if self.config.frequency_penalty is not None:
-            params["frequency_penalty"] = self.config.frequency_penalty
-        if self.config.presence_penalty is not None:
-            params["presence_penalty"] = self.config.presence_penalty
-        if self.config.stop:
-            params["stop"] = self.config.stop
-
-        # 深度思考 (豆包 Seed 系列)
-        if self.config.reasoning.enabled:
-            params["thinking"] = {"type": self.config.reasoning.volcengine_thinking_type}
-
-        # 结构化输出
-        if self.config.structured_output.enabled:
-            if self.config.structured_output.response_type == "json_object":
-                params["response_format"] = {"type": "json_object"}
-            elif self.config.structured_output.json_schema:
-                params["response_format"] = {
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": self.config.structured_output.schema_name,
-                        "schema": self.config.structured_output.json_schema,
-                        "strict": self.config.structured_output.strict,
-                    },
-                }
-
-        # 多模态图片限制
-        if (
-            self.config.multimodal.volcengine_max_pixels
-            or self.config.multimodal.volcengine_min_pixels
-        ):
-            image_limit: dict[str, int] = {}
-            if self.config.multimodal.volcengine_max_pixels:
-                image_limit["max_pixels"] = self.config.multimodal.volcengine_max_pixels
-            if self.config.multimodal.volcengine_min_pixels:
-                image_limit["min_pixels"] = self.config.multimodal.volcengine_min_pixels
-            params["image_pixel_limit"] = image_limit
-
-        return params
-
-    def _build_web_search_tools(self) -> list[dict[str, Any]]:
-        """构建联网搜索工具"""
-        if not self.config.web_search.enabled:
-            return []
-
-        tool: dict[str, Any] = {
-            "type": "web_search",
-            "web_search": {
-                "enable": True,
-            },
-        }
-
-        if self.config.web_search.volcengine_max_keyword != 3:
-            tool["web_search"]["max_keyword"] = self.config.web_search.volcengine_max_keyword
-        if self.config.web_search.volcengine_limit != 10:
-            tool["web_search"]["limit"] = self.config.web_search.volcengine_limit
-        if self.config.web_search.volcengine_sources:
-            tool["web_search"]["sources"] = self.config.web_search.volcengine_sources
-
-        return [tool]
+        # 固定参数和联网搜索工具只与 (model_id, config) 有关，相同配置的实例共享同一份
+        self._base_params, self._web_search_tools = _static_params(model_id, config)
 
     def chat(
         self,
         messages: list[dict[str, Any]],
         stream: bool = False,
         tools: list[dict[str, Any]] | None = None,
+        include_raw: bool = False,
     ) -> dict[str, Any] | Iterator[dict[str, Any]]:
-        """发送聊天请求"""
-        params = self._build_params(messages)
+        """发送聊天请求 (流式 chunk 默认不携带 raw，需要时传 include_raw=True)"""
+        response = self.client.chat.completions.create(
+            **self._base_params, **self._build_request_params(messages, tools, stream)
+        )
 
-        all_tools = self._build_web_search_tools()
-        if tools:
-            all_tools.extend(tools)
-        if all_tools:
-            params["tools"] = all_tools
+        if stream:
+            return coalesce_stream(
+                self._handle_stream(response, include_raw), self.config.stream_coalesce_ms
+            )
+        else:
+            result = self._handle_response(response)
+            return attach_parsed(result) if self.config.structured_output.enabled else result
+
+    async def achat(
+        self,
+        messages: list[dict[str, Any]],
+        stream: bool = False,
+        tools: list[dict[str, Any]] | None = None,
+        include_raw: bool = False,
+    ) -> dict[str, Any] | AsyncIterator[dict[str, Any]]:
+        """异步发送聊天请求 (流式时返回异步迭代器)"""
+        client = _get_async_ark_client(self.api_key, _ARK_BASE_URL, _ARK_TIMEOUT)
+        response = await client.chat.completions.create(
+            **self._base_params, **self._build_request_params(messages, tools, stream)
+        )
 
         if stream:
-            params["stream"] = True
-            response = self.client.chat.completions.create(**params)
-            return self._handle_stream(response)
+            return acoalesce_stream(
+                self._ahandle_stream(response, include_raw), self.config.stream_coalesce_ms
+            )
         else:
-            response = self.client.chat.completions.create(**params)
-            return self._handle_response(response)
+            result = self._handle_response(response)
+            return attach_parsed(result) if self.config.structured_output.enabled else result
+
+    def _build_request_params(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        stream: bool = False,
+    ) -> dict[str, Any]:
+        """
+        构建单次请求的可变参数 (消息、工具、stream)
+
+        调用时与 _base_params 一起直接展开为关键字参数，
+        不再先合并成一个完整的参数 dict 再展开一次。
+        """
+        params: dict[str, Any] = {"messages": messages}
+        if stream:
+            params["stream"] = True
+
+        if tools:
+            params["tools"] = [*self._web_search_tools, *tools]
+        elif self._web_search_tools:
+            params["tools"] = list(self._web_search_tools)
+
+        return params
 
     def _handle_response(self, response: Any) -> dict[str, Any]:
         """处理非流式响应"""
-        choice = response.choices[0]
+        message = response.choices[0].message
+        prompt_tokens, completion_tokens, total_tokens = _usage_fields(response.usage)
 
         result: dict[str, Any] = {
-            "content": choice.message.content,
+            "content": message.content,
             "usage": {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens,
             },
             "raw": response,
         }
 
-        if hasattr(choice.message, "reasoning_content") and choice.message.reasoning_content:
-            result["reasoning"] = choice.message.reasoning_content
+        if reasoning := getattr(message, "reasoning_content", None):
+            result["reasoning"] = reasoning
 
-        if hasattr(choice.message, "tool_calls") and choice.message.tool_calls:
-            result["tool_calls"] = choice.message.tool_calls
+        if tool_calls := getattr(message, "tool_calls", None):
+            result["tool_calls"] = tool_calls
 
         return result
 
-    def _handle_stream(self, response: Any) -> Iterator[dict[str, Any]]:
+    def _handle_stream(self, response: Any, include_raw: bool = False) -> Iterator[dict[str, Any]]:
         """处理流式响应"""
         for chunk in response:
-            if not chunk.choices:
-                continue
-
-            delta = chunk.choices[0].delta
-
-            result: dict[str, Any] = {
-                "content": delta.content or "",
-                "raw": chunk,
-            }
-
-            if hasattr(delta, "reasoning_content") and delta.reasoning_content:
-                result["reasoning"] = delta.reasoning_content
-
-            yield result
+            if (result := _stream_chunk(chunk, include_raw)) is not None:
+                yield result
+
+    async def _ahandle_stream(
+        self, response: Any, include_raw: bool = False
+    ) -> AsyncIterator[dict[str, Any]]:
+        """处理异步流式响应"""
+        async for chunk in response:
+            if (result := _stream_chunk(chunk, include_raw)) is not None:
+                yield result
 
 
 class VolcengineAdapter(BaseModelAdapter):
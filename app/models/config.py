@@ -12,7 +12,8 @@
 - LiteLLM (统一网关)
 """
 
-from dataclasses import dataclass, field
+from collections.abc import Callable
+from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Literal
 
@@ -55,7 +56,7 @@ PROVIDER_DEFAULT_ENV_VARS: dict[ModelProvider, str | None] = {
 }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ReasoningConfig:
     """
     思考模式配置 (多厂商支持)
@@ -116,39 +117,51 @@ class ReasoningConfig:
         return params
 
     def to_provider_params(self, provider: "ModelProvider") -> dict[str, Any]:
-        """转换为指定厂商的 API 参数"""
-        if not self.enabled:
+        """转换为指定厂商的 API 参数 (每次调用构建新的 dict，调用方可随意修改)"""
+        if not self.enabled or (builder := _REASONING_BUILDERS.get(provider)) is None:
             return {}
+        return builder(self)
+
+    def _openai_params(self) -> dict[str, Any]:
+        return {"reasoning_effort": self.effort} if self.effort != "none" else {}
+
+    def _google_params(self) -> dict[str, Any]:
+        params: dict[str, Any] = {}
+        if self.max_tokens:
+            params["thinking_budget"] = self.max_tokens
+        if self.google_thinking_level:
+            params["thinking_level"] = self.google_thinking_level
+        if self.include_reasoning:
+            params["include_thoughts"] = True
+        return params
 
-        if provider == ModelProvider.OPENROUTER:
-            return self.to_openrouter_params()
-        elif provider == ModelProvider.OPENAI:
-            return {"reasoning_effort": self.effort} if self.effort != "none" else {}
-        elif provider == ModelProvider.GOOGLE:
-            params = {}
-            if self.max_tokens:
-                params["thinking_budget"] = self.max_tokens
-            if self.google_thinking_level:
-                params["thinking_level"] = self.google_thinking_level
-            if self.include_reasoning:
-                params["include_thoughts"] = True
-            return params
-        elif provider == ModelProvider.ANTHROPIC:
-            return {
-                "thinking": {
-                    "type": self.anthropic_thinking_type,
-                    "budget_tokens": self.max_tokens or 1024,
-                }
+    def _anthropic_params(self) -> dict[str, Any]:
+        return {
+            "thinking": {
+                "type": self.anthropic_thinking_type,
+                "budget_tokens": self.max_tokens or 1024,
             }
-        elif provider == ModelProvider.VOLCENGINE:
-            return {"thinking": {"type": self.volcengine_thinking_type}}
-        elif provider == ModelProvider.DASHSCOPE:
-            return {"enable_thinking": True}
-        else:
-            return {}
+        }
+
+    def _volcengine_params(self) -> dict[str, Any]:
+        return {"thinking": {"type": self.volcengine_thinking_type}}
+
+    def _dashscope_params(self) -> dict[str, Any]:
+        return {"enable_thinking": True}
 
 
-@dataclass
+# provider -> 参数构建函数 (未列出的厂商不支持思考模式参数)
+_REASONING_BUILDERS: dict[ModelProvider, Callable[[ReasoningConfig], dict[str, Any]]] = {
+    ModelProvider.OPENROUTER: ReasoningConfig.to_openrouter_params,
+    ModelProvider.OPENAI: ReasoningConfig._openai_params,
+    ModelProvider.GOOGLE: ReasoningConfig._google_params,
+    ModelProvider.ANTHROPIC: ReasoningConfig._anthropic_params,
+    ModelProvider.VOLCENGINE: ReasoningConfig._volcengine_params,
+    ModelProvider.DASHSCOPE: ReasoningConfig._dashscope_params,
+}
+
+
+@dataclass(frozen=True, slots=True)
 class WebSearchConfig:
     """
     网络搜索配置 (多厂商支持)
@@ -229,35 +242,42 @@ class WebSearchConfig:
         return ":online" if self.enabled else ""
 
     def to_provider_params(self, provider: "ModelProvider") -> dict[str, Any]:
-        """转换为指定厂商的 API 参数"""
-        if not self.enabled:
+        """转换为指定厂商的 API 参数 (每次调用构建新的 dict，调用方可随意修改)"""
+        if not self.enabled or (builder := _WEB_SEARCH_BUILDERS.get(provider)) is None:
             return {}
+        return builder(self)
 
-        if provider == ModelProvider.OPENROUTER:
-            return self.to_openrouter_params()
-        elif provider == ModelProvider.GOOGLE:
-            return {"search": True}
-        elif provider == ModelProvider.DASHSCOPE:
-            params = {"enable_search": True}
-            if self.dashscope_search_strategy != "standard" or self.dashscope_forced_search:
-                params["search_options"] = {
-                    "search_strategy": self.dashscope_search_strategy,
-                    "forced_search": self.dashscope_forced_search,
-                }
-            return params
-        elif provider == ModelProvider.VOLCENGINE:
-            tool = {"type": "web_search", "max_keyword": self.volcengine_max_keyword}
-            if self.volcengine_limit != 10:
-                tool["limit"] = self.volcengine_limit
-            if self.volcengine_sources:
-                tool["sources"] = self.volcengine_sources
-            return {"tools": [tool]}
-        else:
-            # OpenAI/Anthropic/Ollama/LiteLLM 需要通过工具调用实现
-            return {}
+    def _google_params(self) -> dict[str, Any]:
+        return {"search": True}
+
+    def _dashscope_params(self) -> dict[str, Any]:
+        params: dict[str, Any] = {"enable_search": True}
+        if self.dashscope_search_strategy != "standard" or self.dashscope_forced_search:
+            params["search_options"] = {
+                "search_strategy": self.dashscope_search_strategy,
+                "forced_search": self.dashscope_forced_search,
+            }
+        return params
+
+    def _volcengine_params(self) -> dict[str, Any]:
+        tool: dict[str, Any] = {"type": "web_search", "max_keyword": self.volcengine_max_keyword}
+        if self.volcengine_limit != 10:
+            tool["limit"] = self.volcengine_limit
+        if self.volcengine_sources:
+            tool["sources"] = self.volcengine_sources
+        return {"tools": [tool]}
+
+
+# provider -> 参数构建函数 (OpenAI/Anthropic/Ollama/LiteLLM 需要通过工具调用实现，不在表中)
+_WEB_SEARCH_BUILDERS: dict[ModelProvider, Callable[[WebSearchConfig], dict[str, Any]]] = {
+    ModelProvider.OPENROUTER: WebSearchConfig.to_openrouter_params,
+    ModelProvider.GOOGLE: WebSearchConfig._google_params,
+    ModelProvider.DASHSCOPE: WebSearchConfig._dashscope_params,
+    ModelProvider.VOLCENGINE: WebSearchConfig._volcengine_params,
+}
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MultimodalConfig:
     """
     多模态配置 (多厂商支持)
@@ -282,7 +302,7 @@ class MultimodalConfig:
     volcengine_min_pixels: int | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StructuredOutputConfig:
     """
     结构化输出配置 (多厂商支持)
@@ -314,47 +334,54 @@ class StructuredOutputConfig:
     strict: bool = False
 
     def to_provider_params(self, provider: "ModelProvider") -> dict[str, Any]:
-        """转换为指定厂商的 API 参数"""
-        if not self.enabled:
+        """转换为指定厂商的 API 参数 (每次调用构建新的 dict，调用方可随意修改)"""
+        if not self.enabled or (builder := _STRUCTURED_OUTPUT_BUILDERS.get(provider)) is None:
             return {}
+        return builder(self)
 
-        if provider in (ModelProvider.OPENAI, ModelProvider.OPENROUTER, ModelProvider.LITELLM):
-            if self.response_type == "json_object":
-                return {"response_format": {"type": "json_object"}}
-            else:
-                return {
-                    "response_format": {
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": self.schema_name,
-                            "schema": self.json_schema or {},
-                            "strict": self.strict,
-                        },
-                    }
-                }
-        elif provider == ModelProvider.GOOGLE:
-            return {"response_mime_type": "application/json"}
-        elif provider == ModelProvider.DASHSCOPE:
+    def _response_format_params(self) -> dict[str, Any]:
+        """OpenAI 兼容的 response_format (json_object / json_schema)"""
+        if self.response_type == "json_object":
             return {"response_format": {"type": "json_object"}}
-        elif provider == ModelProvider.VOLCENGINE:
-            if self.response_type == "json_object":
-                return {"response_format": {"type": "json_object"}}
-            else:
-                return {
-                    "response_format": {
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": self.schema_name,
-                            "schema": self.json_schema or {},
-                            "strict": self.strict,
-                        },
-                    }
-                }
-        else:
-            return {}
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": self.schema_name,
+                    "schema": self.json_schema or {},
+                    "strict": self.strict,
+                },
+            }
+        }
+
+    def _google_params(self) -> dict[str, Any]:
+        return {"response_mime_type": "application/json"}
 
+    def _json_object_params(self) -> dict[str, Any]:
+        return {"response_format": {"type": "json_object"}}
+
+
+# provider -> 参数构建函数 (未列出的厂商不支持结构化输出参数)
+_STRUCTURED_OUTPUT_BUILDERS: dict[
+    ModelProvider, Callable[[StructuredOutputConfig], dict[str, Any]]
+] = {
+    ModelProvider.OPENAI: StructuredOutputConfig._response_format_params,
+    ModelProvider.OPENROUTER: StructuredOutputConfig._response_format_params,
+    ModelProvider.LITELLM: StructuredOutputConfig._response_format_params,
+    ModelProvider.GOOGLE: StructuredOutputConfig._google_params,
+    ModelProvider.DASHSCOPE: StructuredOutputConfig._json_object_params,
+    ModelProvider.VOLCENGINE: StructuredOutputConfig._response_format_params,
+}
 
-@dataclass
+
+# 默认子配置 (不可变，所有未显式指定的 ModelConfig 共享同一实例，不必每次新建)
+DEFAULT_REASONING_CONFIG = ReasoningConfig()
+DEFAULT_WEB_SEARCH_CONFIG = WebSearchConfig()
+DEFAULT_MULTIMODAL_CONFIG = MultimodalConfig()
+DEFAULT_STRUCTURED_OUTPUT_CONFIG = StructuredOutputConfig()
+
+
+@dataclass(frozen=True, slots=True)
 class ProjectConfig:
     """
     项目级配置
@@ -385,7 +412,7 @@ class ProjectConfig:
     api_key_env: str | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelConfig:
     """
     统一模型配置 (多厂商支持)
@@ -498,16 +525,32 @@ class ModelConfig:
     # ============== 高级配置 ==============
 
     # 思考模式配置
-    reasoning: ReasoningConfig = field(default_factory=ReasoningConfig)
+    reasoning: ReasoningConfig = DEFAULT_REASONING_CONFIG
 
     # 网络搜索配置
-    web_search: WebSearchConfig = field(default_factory=WebSearchConfig)
+    web_search: WebSearchConfig = DEFAULT_WEB_SEARCH_CONFIG
 
     # 多模态配置
-    multimodal: MultimodalConfig = field(default_factory=MultimodalConfig)
+    multimodal: MultimodalConfig = DEFAULT_MULTIMODAL_CONFIG
 
     # 结构化输出配置
-    structured_output: StructuredOutputConfig = field(default_factory=StructuredOutputConfig)
+    structured_output: StructuredOutputConfig = DEFAULT_STRUCTURED_OUTPUT_CONFIG
+
+    # 提示词缓存 (复用较长的 system prompt 前缀，降低输入 token 费用和首 token 延迟)
+    # - Anthropic: cache_system_prompt
+    # - DashScope: 较长的 system 消息附加 cache_control (显式缓存)
+    prompt_cache: bool = False
+
+    # 流式输出合并窗口 (毫秒)，默认 0 即逐 chunk 产出
+    # 开启后第一个 chunk 立即产出，之后窗口内到达的增量 chunk 合并为一个再产出，减少下游 SSE 帧数
+    # 同步流只在下一个 chunk 到达时冲刷，上游停顿时已缓冲的内容会被推迟 (见 adapters/_stream)
+    # 用于 DashScope / 火山方舟
+    stream_coalesce_ms: int = 0
+
+    # 合并相同的在途请求 (single-flight)
+    # 默认仅在 temperature=0 (输出确定) 时合并；开启后无论 temperature 均合并
+    # 目前用于 DashScope 非流式请求
+    dedupe_requests: bool = False
 
     # ============== Ollama 特有配置 ==============
 
@@ -517,6 +560,19 @@ class ModelConfig:
     # Ollama Host 环境变量名（三层优先级）
     ollama_host_env: str | None = None
 
+    # Ollama 运行参数 (放在 options 中，None 表示使用 Ollama 默认值)
+    # - num_ctx: 上下文窗口；调大可容纳更长 prompt，但显存占用随之增加
+    # - num_batch: prompt 评估的批大小 (默认 512)；调大可加快长 prompt 处理，占用更多显存
+    # - num_thread / num_gpu: CPU 线程数 / 卸载到 GPU 的层数
+    ollama_num_ctx: int | None = None
+    ollama_num_batch: int | None = None
+    ollama_num_thread: int | None = None
+    ollama_num_gpu: int | None = None
+
+    # 请求结束后模型在内存中保留的时间 (如 "30m"；-1 常驻，0 立即卸载)
+    # None 使用 Ollama 默认值 (5 分钟)；常驻可避免重新加载模型的延迟，但会一直占用显存
+    ollama_keep_alive: float | str | None = None
+
     # ============== LiteLLM 特有配置 ==============
 
     # LiteLLM API Base URL
@@ -621,7 +677,15 @@ class ModelConfig:
 
     def get_common_params(self) -> dict[str, Any]:
         """获取通用模型参数（所有厂商共享）"""
-        params = {}
+        return self._build_common_params()
+
+    def to_provider_params(self) -> dict[str, Any]:
+        """转换为当前 provider 的 API 参数"""
+        return self._build_provider_params()
+
+    def _build_common_params(self) -> dict[str, Any]:
+        """计算通用模型参数"""
+        params: dict[str, Any] = {}
         if self.temperature is not None:
             params["temperature"] = self.temperature
         if self.max_tokens is not None:
@@ -640,9 +704,9 @@ class ModelConfig:
             params["stop"] = self.stop
         return params
 
-    def to_provider_params(self) -> dict[str, Any]:
-        """转换为当前 provider 的 API 参数"""
-        params = self.get_common_params()
+    def _build_provider_params(self) -> dict[str, Any]:
+        """计算当前 provider 的 API 参数"""
+        params = self._build_common_params()
 
         # 添加 Reasoning 参数
         params.update(self.reasoning.to_provider_params(self.provider))
@@ -656,7 +720,7 @@ class ModelConfig:
         return params
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryConfig:
     """
     Agent 记忆配置
@@ -727,7 +791,7 @@ class MemoryConfig:
         return params
 
 
-@dataclass
+@dataclass(slots=True)
 class KnowledgeConfig:
     """
     知识库配置
@@ -5,9 +5,14 @@
 """
 
 import logging
+from functools import lru_cache
 from typing import Any
 
 from app.models.config import (
+    DEFAULT_MULTIMODAL_CONFIG,
+    DEFAULT_REASONING_CONFIG,
+    DEFAULT_STRUCTURED_OUTPUT_CONFIG,
+    DEFAULT_WEB_SEARCH_CONFIG,
     ModelConfig,
     ModelProvider,
     MultimodalConfig,
@@ -71,6 +76,29 @@ def create_model(
     return registry.get_model(config, project_config, variant)
 
 
+def create_models(
+    configs: list[ModelConfig],
+    project_config: ProjectConfig | None = None,
+    variant: ModelVariant | None = None,
+) -> list[Any]:
+    """
+    批量创建模型实例 (按输入顺序返回，批次内相同配置只解析一次)
+
+    Args:
+        configs: 模型配置列表
+        project_config: 项目级配置（可选）
+        variant: 模型变体（可选）
+
+    Returns:
+        模型实例列表
+    """
+    return get_registry().get_models(configs, project_config, variant)
+
+
+# create_model_from_dict 中需要构建为子配置对象的嵌套字段
+_NESTED_KEYS = frozenset({"reasoning", "web_search", "multimodal", "structured_output"})
+
+
 def create_model_from_dict(config_dict: dict[str, Any]) -> Any:
     """
     从字典创建模型（便于从配置文件加载）
@@ -93,35 +121,91 @@ def create_model_from_dict(config_dict: dict[str, Any]) -> Any:
         }
         model = create_model_from_dict(config)
     """
-    # 复制以避免修改原字典
-    config_dict = config_dict.copy()
+    # 只读取不修改原字典
+    if not _NESTED_KEYS & config_dict.keys():
+        # 快速路径：没有嵌套配置，直接使用 ModelConfig 的默认子配置
+        if isinstance(provider := config_dict.get("provider"), str):
+            return create_model(ModelConfig(**{**config_dict, "provider": ModelProvider(provider)}))
+        return create_model(ModelConfig(**config_dict))
+
+    # 顶层字段直接筛选，嵌套配置单独取出
+    fields = {key: value for key, value in config_dict.items() if key not in _NESTED_KEYS}
 
     # 处理 provider 枚举
-    if "provider" in config_dict:
-        provider_str = config_dict.pop("provider")
-        if isinstance(provider_str, str):
-            config_dict["provider"] = ModelProvider(provider_str)
+    if isinstance(provider := fields.get("provider"), str):
+        fields["provider"] = ModelProvider(provider)
 
     # 提取嵌套配置
-    reasoning_dict = config_dict.pop("reasoning", {})
-    web_search_dict = config_dict.pop("web_search", {})
-    multimodal_dict = config_dict.pop("multimodal", {})
-    structured_output_dict = config_dict.pop("structured_output", {})
+    reasoning_dict = config_dict.get("reasoning") or {}
+    web_search_dict = config_dict.get("web_search") or {}
+    multimodal_dict = config_dict.get("multimodal") or {}
+    structured_output_dict = config_dict.get("structured_output") or {}
 
     # 创建配置对象
     config = ModelConfig(
-        **config_dict,
-        reasoning=ReasoningConfig(**reasoning_dict) if reasoning_dict else ReasoningConfig(),
-        web_search=WebSearchConfig(**web_search_dict) if web_search_dict else WebSearchConfig(),
-        multimodal=MultimodalConfig(**multimodal_dict) if multimodal_dict else MultimodalConfig(),
+        **fields,
+        reasoning=ReasoningConfig(**reasoning_dict) if reasoning_dict else DEFAULT_REASONING_CONFIG,
+        web_search=WebSearchConfig(**web_search_dict)
+        if web_search_dict
+        else DEFAULT_WEB_SEARCH_CONFIG,
+        multimodal=MultimodalConfig(**multimodal_dict)
+        if multimodal_dict
+        else DEFAULT_MULTIMODAL_CONFIG,
         structured_output=StructuredOutputConfig(**structured_output_dict)
         if structured_output_dict
-        else StructuredOutputConfig(),
+        else DEFAULT_STRUCTURED_OUTPUT_CONFIG,
     )
 
     return create_model(config)
 
 
+# ============== 便捷函数 ==============
+
+# 预设名 -> ModelConfig 固定字段 (采样参数等由各便捷函数的参数传入)
+_PRESETS: dict[str, dict[str, Any]] = {
+    # OpenRouter
+    "gemini_flash": {"model_id": "google/gemini-2.5-flash-preview-09-2025"},
+    "gemini_pro": {"model_id": "google/gemini-3-pro-preview"},
+    "claude_sonnet": {"model_id": "anthropic/claude-sonnet-4"},
+    "gpt_4_1": {"model_id": "openai/gpt-4.1"},
+    # 直连
+    "openai_gpt4o": {"provider": ModelProvider.OPENAI, "model_id": "gpt-4o"},
+    "google_gemini": {"provider": ModelProvider.GOOGLE},
+    "anthropic_claude": {"provider": ModelProvider.ANTHROPIC},
+    "dashscope_qwen": {"provider": ModelProvider.DASHSCOPE},
+    "volcengine_doubao": {"provider": ModelProvider.VOLCENGINE},
+    "ollama_local": {"provider": ModelProvider.OLLAMA},
+}
+
+
+@lru_cache(maxsize=256)
+def _preset_config(
+    preset: str,
+    *,
+    reasoning_enabled: bool | None = None,
+    reasoning_effort: str = "medium",
+    web_search_enabled: bool | None = None,
+    **fields: Any,
+) -> ModelConfig:
+    """
+    根据预设构建 ModelConfig
+
+    Args:
+        preset: _PRESETS 中的预设名
+        reasoning_enabled: 传入时构建 ReasoningConfig
+        reasoning_effort: 思考努力等级 (配合 reasoning_enabled)
+        web_search_enabled: 传入时构建 WebSearchConfig
+        **fields: 其余 ModelConfig 字段 (temperature、max_tokens 等)
+
+    配置为不可变 dataclass，参数相同的调用直接复用同一个 ModelConfig 实例。
+    """
+    if reasoning_enabled is not None:
+        fields["reasoning"] = ReasoningConfig(enabled=reasoning_enabled, effort=reasoning_effort)
+    if web_search_enabled is not None:
+        fields["web_search"] = WebSearchConfig(enabled=web_search_enabled)
+    return ModelConfig(**{**_PRESETS[preset], **fields})
+
+
 # ============== 便捷函数 (OpenRouter) ==============
 
 
@@ -132,16 +216,15 @@ def create_gemini_flash(
     reasoning_effort: str = "medium",
 ) -> Any:
     """创建 Gemini 2.5 Flash 模型 (via OpenRouter)"""
-    config = ModelConfig(
-        model_id="google/gemini-2.5-flash-preview-09-2025",
-        temperature=temperature,
-        max_tokens=max_tokens,
-        reasoning=ReasoningConfig(
-            enabled=reasoning_enabled,
-            effort=reasoning_effort,
-        ),
+    return create_model(
+        _preset_config(
+            "gemini_flash",
+            temperature=temperature,
+            max_tokens=max_tokens,
+            reasoning_enabled=reasoning_enabled,
+            reasoning_effort=reasoning_effort,
+        )
     )
-    return create_model(config)
 
 
 def create_gemini_pro(
@@ -151,16 +234,15 @@ def create_gemini_pro(
     reasoning_effort: str = "high",
 ) -> Any:
     """创建 Gemini 3 Pro 模型 (via OpenRouter)"""
-    config = ModelConfig(
-        model_id="google/gemini-3-pro-preview",
-        temperature=temperature,
-        max_tokens=max_tokens,
-        reasoning=ReasoningConfig(
-            enabled=reasoning_enabled,
-            effort=reasoning_effort,
-        ),
+    return create_model(
+        _preset_config(
+            "gemini_pro",
+            temperature=temperature,
+            max_tokens=max_tokens,
+            reasoning_enabled=reasoning_enabled,
+            reasoning_effort=reasoning_effort,
+        )
     )
-    return create_model(config)
 
 
 def create_claude_sonnet(
@@ -169,13 +251,14 @@ def create_claude_sonnet(
     reasoning_enabled: bool = False,
 ) -> Any:
     """创建 Claude Sonnet 4 模型 (via OpenRouter)"""
-    config = ModelConfig(
-        model_id="anthropic/claude-sonnet-4",
-        temperature=temperature,
-        max_tokens=max_tokens,
-        reasoning=ReasoningConfig(enabled=reasoning_enabled),
+    return create_model(
+        _preset_config(
+            "claude_sonnet",
+            temperature=temperature,
+            max_tokens=max_tokens,
+            reasoning_enabled=reasoning_enabled,
+        )
     )
-    return create_model(config)
 
 
 def create_gpt_4_1(
@@ -184,13 +267,14 @@ def create_gpt_4_1(
     web_search_enabled: bool = False,
 ) -> Any:
     """创建 GPT-4.1 模型 (via OpenRouter)"""
-    config = ModelConfig(
-        model_id="openai/gpt-4.1",
-        temperature=temperature,
-        max_tokens=max_tokens,
-        web_search=WebSearchConfig(enabled=web_search_enabled),
+    return create_model(
+        _preset_config(
+            "gpt_4_1",
+            temperature=temperature,
+            max_tokens=max_tokens,
+            web_search_enabled=web_search_enabled,
+        )
     )
-    return create_model(config)
 
 
 # ============== 便捷函数 (直连) ==============
@@ -201,13 +285,9 @@ def create_openai_gpt4o(
     max_tokens: int = 8192,
 ) -> Any:
     """创建 OpenAI GPT-4o 模型 (直连)"""
-    config = ModelConfig(
-        provider=ModelProvider.OPENAI,
-        model_id="gpt-4o",
-        temperature=temperature,
-        max_tokens=max_tokens,
+    return create_model(
+        _preset_config("openai_gpt4o", temperature=temperature, max_tokens=max_tokens)
     )
-    return create_model(config)
 
 
 def create_google_gemini(
@@ -217,14 +297,15 @@ def create_google_gemini(
     web_search_enabled: bool = False,
 ) -> Any:
     """创建 Google Gemini 模型 (直连)"""
-    config = ModelConfig(
-        provider=ModelProvider.GOOGLE,
-        model_id=model_id,
-        temperature=temperature,
-        max_tokens=max_tokens,
-        web_search=WebSearchConfig(enabled=web_search_enabled),
+    return create_model(
+        _preset_config(
+            "google_gemini",
+            model_id=model_id,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            web_search_enabled=web_search_enabled,
+        )
     )
-    return create_model(config)
 
 
 def create_anthropic_claude(
@@ -233,13 +314,14 @@ def create_anthropic_claude(
     max_tokens: int = 8192,
 ) -> Any:
     """创建 Anthropic Claude 模型 (直连)"""
-    config = ModelConfig(
-        provider=ModelProvider.ANTHROPIC,
-        model_id=model_id,
-        temperature=temperature,
-        max_tokens=max_tokens,
+    return create_model(
+        _preset_config(
+            "anthropic_claude",
+            model_id=model_id,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
     )
-    return create_model(config)
 
 
 def create_dashscope_qwen(
@@ -249,14 +331,15 @@ def create_dashscope_qwen(
     web_search_enabled: bool = False,
 ) -> Any:
     """创建阿里云 Qwen 模型 (直连)"""
-    config = ModelConfig(
-        provider=ModelProvider.DASHSCOPE,
-        model_id=model_id,
-        temperature=temperature,
-        max_tokens=max_tokens,
-        web_search=WebSearchConfig(enabled=web_search_enabled),
+    return create_model(
+        _preset_config(
+            "dashscope_qwen",
+            model_id=model_id,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            web_search_enabled=web_search_enabled,
+        )
     )
-    return create_model(config)
 
 
 def create_volcengine_doubao(
@@ -266,14 +349,15 @@ def create_volcengine_doubao(
     reasoning_enabled: bool = False,
 ) -> Any:
     """创建火山方舟豆包模型 (直连)"""
-    config = ModelConfig(
-        provider=ModelProvider.VOLCENGINE,
-        model_id=model_id,
-        temperature=temperature,
-        max_tokens=max_tokens,
-        reasoning=ReasoningConfig(enabled=reasoning_enabled),
+    return create_model(
+        _preset_config(
+            "volcengine_doubao",
+            model_id=model_id,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            reasoning_enabled=reasoning_enabled,
+        )
     )
-    return create_model(config)
 
 
 def create_ollama_local(
@@ -282,10 +366,11 @@ def create_ollama_local(
     temperature: float = 0.7,
 ) -> Any:
     """创建 Ollama 本地模型"""
-    config = ModelConfig(
-        provider=ModelProvider.OLLAMA,
-        model_id=model_id,
-        ollama_host=host,
-        temperature=temperature,
+    return create_model(
+        _preset_config(
+            "ollama_local",
+            model_id=model_id,
+            ollama_host=host,
+            temperature=temperature,
+        )
     )
-    return create_model(config)
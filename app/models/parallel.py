@@ -0,0 +1,113 @@
+"""
+多模型并发调用
+
+同一组消息同时发给多个模型 (集成投票、A/B 对比、竞速取最快结果)，
+总耗时约等于最慢 (multi_chat) 或最快 (first_completed_chat) 的那个模型。
+
+支持三类模型:
+- 提供 achat() 的适配器模型 (DashScope、火山方舟)
+- Agno Model (OpenAI、Claude 等)，通过 aresponse() 调用，结果转换为相同的 dict 格式
+- 只有同步 chat() 的模型，在线程池中执行，不阻塞事件循环
+"""
+
+import asyncio
+from typing import Any, cast
+
+DEFAULT_TIMEOUT = 60.0
+
+
+def _from_model_response(response: Any) -> dict[str, Any]:
+    """将 Agno ModelResponse 转换为与适配器 chat() 相同的结果 dict"""
+    result: dict[str, Any] = {"content": response.content or ""}
+    if reasoning := getattr(response, "reasoning_content", None):
+        result["reasoning"] = reasoning
+    if (usage := getattr(response, "response_usage", None)) is not None:
+        result["usage"] = {
+            "prompt_tokens": usage.input_tokens,
+            "completion_tokens": usage.output_tokens,
+            "total_tokens": usage.total_tokens,
+        }
+    return result
+
+
+async def _achat(model: Any, messages: list[dict[str, Any]]) -> dict[str, Any]:
+    """调用单个模型 (优先使用原生异步接口)"""
+    if (achat := getattr(model, "achat", None)) is not None:
+        return cast(dict[str, Any], await achat(messages))
+    if (aresponse := getattr(model, "aresponse", None)) is not None:
+        from agno.models.message import Message
+
+        response = await aresponse([Message(**message) for message in messages])
+        return _from_model_response(response)
+    if (chat := getattr(model, "chat", None)) is not None:
+        return cast(dict[str, Any], await asyncio.to_thread(chat, messages))
+    raise TypeError(f"{type(model).__name__} has no achat(), aresponse() or chat()")
+
+
+async def multi_chat(
+    models: list[Any],
+    messages: list[dict[str, Any]],
+    timeout: float = DEFAULT_TIMEOUT,
+) -> list[dict[str, Any] | BaseException]:
+    """
+    将同一组消息并发发送给多个模型
+
+    Args:
+        models: 模型实例列表
+        messages: 消息列表
+        timeout: 单个模型的超时时间 (秒)
+
+    Returns:
+        与 models 一一对应的响应；失败或超时的模型对应位置为异常对象
+    """
+    return list(
+        await asyncio.gather(
+            *(asyncio.wait_for(_achat(model, messages), timeout) for model in models),
+            return_exceptions=True,
+        )
+    )
+
+
+async def first_completed_chat(
+    models: list[Any],
+    messages: list[dict[str, Any]],
+    timeout: float = DEFAULT_TIMEOUT,
+) -> tuple[int, dict[str, Any]]:
+    """
+    将同一组消息并发发送给多个模型，返回最先成功的响应 (其余请求被取消)
+
+    Args:
+        models: 模型实例列表
+        messages: 消息列表
+        timeout: 总超时时间 (秒)
+
+    Returns:
+        (模型在 models 中的下标, 响应)
+
+    Raises:
+        TimeoutError: 超时前没有任何模型成功
+        ExceptionGroup: 所有模型都失败 (有模型被取消或抛出非 Exception 异常时为 BaseExceptionGroup)
+    """
+    if not models:
+        raise ValueError("models must not be empty")
+
+    tasks = [asyncio.create_task(_achat(model, messages)) for model in models]
+    pending = set(tasks)
+    try:
+        async with asyncio.timeout(timeout):
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        return tasks.index(task), task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    # 被取消的任务调用 exception() 会抛出 CancelledError，用一个 CancelledError 实例代替；
+    # 全部为 Exception 时 BaseExceptionGroup 构造出的就是 ExceptionGroup
+    errors = [
+        asyncio.CancelledError() if task.cancelled() else cast(BaseException, task.exception())
+        for task in tasks
+    ]
+    raise BaseExceptionGroup("all models failed", errors)
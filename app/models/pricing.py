@@ -4,11 +4,12 @@
 支持多货币和成本估算。
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
+from functools import lru_cache
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelPricing:
     """模型定价信息"""
 
@@ -17,17 +18,24 @@ class ModelPricing:
     unit: Decimal = Decimal("0.000001")  # 默认 per 1M tokens
     currency: str = "USD"
 
+    # 每 token 单价 (input/output × unit)，构造时计算一次
+    _input_per_token: Decimal = field(init=False, repr=False, compare=False)
+    _output_per_token: Decimal = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_input_per_token", self.input * self.unit)
+        object.__setattr__(self, "_output_per_token", self.output * self.unit)
+
     def estimate_cost(self, input_tokens: int, output_tokens: int) -> Decimal:
         """估算单次调用成本"""
-        return (
-            Decimal(input_tokens) * self.input + Decimal(output_tokens) * self.output
-        ) * self.unit
+        return input_tokens * self._input_per_token + output_tokens * self._output_per_token
 
     @classmethod
+    @lru_cache(maxsize=256)
     def from_per_million(
         cls, input_per_m: float, output_per_m: float, currency: str = "USD"
     ) -> "ModelPricing":
-        """从 per 1M tokens 价格创建"""
+        """从 per 1M tokens 价格创建 (不可变，相同价格复用同一实例)"""
         return cls(
             input=Decimal(str(input_per_m)),
             output=Decimal(str(output_per_m)),
@@ -2,20 +2,19 @@
 Provider 注册表 (单例 + 字典缓存)
 
 核心功能:
-1. 加载内置 Adapter (代码定义)
+1. 按需加载 Adapter (register_adapter 注册工厂，首次使用某个 Provider 时才导入并创建)
 2. 解析变体 (fast → 具体模型 ID)
-3. 字典实例缓存 (provider + model_id + api_key_hash, max=100)
+3. 字典实例缓存 (provider + model_id + api_key_hash, max=100, FIFO 淘汰)
 """
 
 import logging
-from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import replace
+from functools import cache
 from typing import Any
 
+from app.models import adapters
 from app.models.adapters.base import BaseModelAdapter
-from app.models.adapters.dashscope import DashScopeAdapter
-from app.models.adapters.gateway import GatewayAdapter
-from app.models.adapters.native import NativeAdapter
-from app.models.adapters.volcengine import VolcengineAdapter
 from app.models.config import ModelConfig, ModelProvider, ProjectConfig
 from app.models.variants import ModelVariant, resolve_variant
 
@@ -23,34 +22,102 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_CACHE_SIZE = 100
 
+_MISSING = object()
 
-class LRUCache:
-    """简单的 LRU 缓存实现"""
+# Provider -> Adapter 工厂 (由 register_adapter 注册)
+_ADAPTER_FACTORIES: dict[ModelProvider, Callable[[ModelProvider], BaseModelAdapter]] = {}
+
+
+@cache
+def _builtin_adapter(provider: ModelProvider) -> BaseModelAdapter | None:
+    """获取内置 Adapter (每个 Provider 首次使用时创建一次，进程内共享)"""
+    factory = _ADAPTER_FACTORIES.get(provider)
+    if factory is None:
+        return None
+    logger.debug("Loaded builtin adapter: %s", provider.value)
+    return factory(provider)
+
+
+def register_adapter(
+    *providers: ModelProvider,
+) -> Callable[
+    [Callable[[ModelProvider], BaseModelAdapter]], Callable[[ModelProvider], BaseModelAdapter]
+]:
+    """
+    注册 Adapter 工厂的装饰器
+
+    工厂接收 Provider 枚举并返回 Adapter，首次使用该 Provider 时才调用；
+    重复注册会覆盖原有工厂，并丢弃已创建的 Adapter。
+
+    示例:
+        @register_adapter(ModelProvider.OPENROUTER, ModelProvider.LITELLM)
+        def _gateway(provider: ModelProvider) -> BaseModelAdapter:
+            return GatewayAdapter(provider.value)
+    """
+
+    def decorator(
+        factory: Callable[[ModelProvider], BaseModelAdapter],
+    ) -> Callable[[ModelProvider], BaseModelAdapter]:
+        for provider in providers:
+            _ADAPTER_FACTORIES[provider] = factory
+        _builtin_adapter.cache_clear()
+        return factory
+
+    return decorator
+
+
+# 内置 Adapter (通过 adapters 包按需导入适配器模块)
+@register_adapter(ModelProvider.OPENROUTER, ModelProvider.LITELLM)
+def _gateway_adapter(provider: ModelProvider) -> BaseModelAdapter:
+    return adapters.GatewayAdapter(provider.value)
+
+
+@register_adapter(
+    ModelProvider.OPENAI, ModelProvider.GOOGLE, ModelProvider.ANTHROPIC, ModelProvider.OLLAMA
+)
+def _native_adapter(provider: ModelProvider) -> BaseModelAdapter:
+    return adapters.NativeAdapter(provider.value)
+
+
+@register_adapter(ModelProvider.DASHSCOPE)
+def _dashscope_adapter(provider: ModelProvider) -> BaseModelAdapter:
+    return adapters.DashScopeAdapter()
+
+
+@register_adapter(ModelProvider.VOLCENGINE)
+def _volcengine_adapter(provider: ModelProvider) -> BaseModelAdapter:
+    return adapters.VolcengineAdapter()
+
+
+class FIFOCache:
+    """
+    简单的 FIFO 缓存实现
+
+    基于 dict 的插入顺序，满时淘汰最早写入的项。缓存的模型实例预热后几乎全部命中，
+    命中路径只需一次 dict 查找，不再像 LRU 那样每次命中都调整顺序。
+    """
 
     def __init__(self, maxsize: int = 100):
-        self._cache: OrderedDict[str, Any] = OrderedDict()
+        self._cache: dict[str, Any] = {}
         self._maxsize = maxsize
         self._hits = 0
         self._misses = 0
 
     def get(self, key: str) -> tuple[bool, Any]:
         """获取缓存项，返回 (命中, 值)"""
-        if key in self._cache:
-            self._cache.move_to_end(key)
-            self._hits += 1
-            return True, self._cache[key]
-        self._misses += 1
-        return False, None
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self._misses += 1
+            return False, None
+        self._hits += 1
+        return True, value
 
     def set(self, key: str, value: Any) -> None:
         """设置缓存项"""
-        if key in self._cache:
-            self._cache.move_to_end(key)
-            self._cache[key] = value
-        else:
-            if len(self._cache) >= self._maxsize:
-                self._cache.popitem(last=False)
-            self._cache[key] = value
+        if key not in self._cache and len(self._cache) >= self._maxsize:
+            del self._cache[next(iter(self._cache))]
+        self._cache[key] = value
 
     def clear(self) -> None:
         """清空缓存"""
@@ -72,40 +139,19 @@ class ProviderRegistry:
     """Provider 注册表 (单例 + 字典缓存)"""
 
     _instance: "ProviderRegistry | None" = None
-    _adapters: dict[str, BaseModelAdapter]
-    _cache: LRUCache
+    _cache: FIFOCache
 
     def __new__(cls, cache_size: int = DEFAULT_CACHE_SIZE) -> "ProviderRegistry":
         if cls._instance is None:
             instance = super().__new__(cls)
-            instance._adapters = {}
-            instance._cache = LRUCache(cache_size)
-            instance._load_builtin_adapters()
+            instance._cache = FIFOCache(cache_size)
             cls._instance = instance
         return cls._instance
 
-    def _load_builtin_adapters(self) -> None:
-        """加载内置 Adapter"""
-        # Gateway (OpenRouter, LiteLLM)
-        self._adapters["openrouter"] = GatewayAdapter("openrouter")
-        self._adapters["litellm"] = GatewayAdapter("litellm")
-
-        # Native (OpenAI, Google, Anthropic, Ollama)
-        self._adapters["openai"] = NativeAdapter("openai")
-        self._adapters["google"] = NativeAdapter("google")
-        self._adapters["anthropic"] = NativeAdapter("anthropic")
-        self._adapters["ollama"] = NativeAdapter("ollama")
-
-        # Custom (DashScope, Volcengine)
-        self._adapters["dashscope"] = DashScopeAdapter()
-        self._adapters["volcengine"] = VolcengineAdapter()
-
-        logger.debug("Loaded %d builtin adapters", len(self._adapters))
-
     def get_adapter(self, provider: ModelProvider) -> BaseModelAdapter:
         """获取指定 Provider 的 Adapter"""
-        adapter = self._adapters.get(provider.value)
-        if not adapter:
+        adapter = _builtin_adapter(provider)
+        if adapter is None:
             raise ValueError(f"Unsupported provider: {provider}")
         return adapter
 
@@ -120,7 +166,7 @@ class ProviderRegistry:
         model_id = config.model_id
         if variant:
             model_id = resolve_variant(config.provider.value, variant, model_id)
-            config = self._with_model_id(config, model_id)
+            config = replace(config, model_id=model_id)
 
         # 获取 Adapter
         adapter = self.get_adapter(config.provider)
@@ -129,7 +175,7 @@ class ProviderRegistry:
         api_key = adapter.get_api_key(config, project_config)
 
         # Ollama 不需要 API Key
-        if config.provider != ModelProvider.OLLAMA and not api_key:
+        if config.provider is not ModelProvider.OLLAMA and not api_key:
             raise ValueError(
                 f"{adapter.provider_name} API Key not found. Set: {adapter.default_env_var}"
             )
@@ -149,11 +195,30 @@ class ProviderRegistry:
         self._cache.set(cache_key, model)
         return model
 
-    def _with_model_id(self, config: ModelConfig, model_id: str) -> ModelConfig:
-        """创建带有新 model_id 的配置副本"""
-        from dataclasses import replace
-
-        return replace(config, model_id=model_id)
+    def get_models(
+        self,
+        configs: list[ModelConfig],
+        project_config: ProjectConfig | None = None,
+        variant: ModelVariant | None = None,
+    ) -> list[Any]:
+        """
+        批量获取模型实例 (按输入顺序返回)
+
+        适用于一次创建多个模型的场景 (主模型 + 备用模型 + 工具模型)；
+        批次内相同的配置只解析一次 (变体、API Key、缓存 Key)，直接复用结果。
+        """
+        resolved: dict[ModelConfig, Any] = {}
+        models = []
+        for config in configs:
+            try:
+                model = resolved.get(config, _MISSING)
+            except TypeError:  # 含 list/dict 字段的配置不可哈希
+                models.append(self.get_model(config, project_config, variant))
+                continue
+            if model is _MISSING:
+                model = resolved[config] = self.get_model(config, project_config, variant)
+            models.append(model)
+        return models
 
     def cache_info(self) -> dict[str, int]:
         """获取缓存统计信息"""
@@ -165,7 +230,7 @@ class ProviderRegistry:
 
     def list_adapters(self) -> list[str]:
         """列出所有已注册的 Adapter"""
-        return list(self._adapters.keys())
+        return [provider.value for provider in _ADAPTER_FACTORIES]
 
     @classmethod
     def reset_instance(cls) -> None:
@@ -176,5 +241,10 @@ class ProviderRegistry:
 
 
 def get_registry(cache_size: int = DEFAULT_CACHE_SIZE) -> ProviderRegistry:
-    """获取 ProviderRegistry 单例"""
-    return ProviderRegistry(cache_size)
+    """
+    获取 ProviderRegistry 单例
+
+    已创建时直接返回现有实例 (不经过 __new__)；cache_size 仅在首次创建时生效。
+    Adapter 按需加载，创建注册表本身只分配一个空缓存。
+    """
+    return ProviderRegistry._instance or ProviderRegistry(cache_size)
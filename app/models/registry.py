@@ -6,6 +6,7 @@
 """
 
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import TYPE_CHECKING, Literal
 
 from app.models.features import ModelFeature
@@ -13,8 +14,36 @@ from app.models.features import ModelFeature
 if TYPE_CHECKING:
     from app.models.pricing import ModelPricing
 
-
-@dataclass
+ReasoningType = Literal["effort", "max_tokens", "none"]
+
+# supported_parameters / input_modalities 中的取值 -> 对应能力
+_PARAMETER_FEATURES = (
+    ("reasoning", ModelFeature.REASONING),
+    ("tools", ModelFeature.TOOL_CALL),
+    ("structured_outputs", ModelFeature.STRUCTURED_OUTPUT),
+)
+_MODALITY_FEATURES = (
+    ("image", ModelFeature.VISION),
+    ("file", ModelFeature.DOCUMENT),
+    ("audio", ModelFeature.AUDIO),
+    ("video", ModelFeature.VIDEO),
+)
+
+
+@lru_cache(maxsize=256)
+def _infer_reasoning_type(model_id: str) -> ReasoningType:
+    """根据模型 ID 推断思考模式类型 (仅对支持 reasoning 的模型调用)"""
+    model_id = model_id.lower()
+    if "gemini" in model_id:
+        return "max_tokens"
+    if any(x in model_id for x in ("o1", "o3", "gpt-5")):
+        return "effort"
+    if "anthropic" in model_id or "deepseek" in model_id:
+        return "max_tokens"
+    return "effort"
+
+
+@dataclass(slots=True)
 class ModelCapabilities:
     """模型能力描述"""
 
@@ -50,7 +79,7 @@ class ModelCapabilities:
     supports_video: bool = False
 
     # 思考模式类型: effort / max_tokens / none
-    reasoning_type: Literal["effort", "max_tokens", "none"] = "none"
+    reasoning_type: ReasoningType = "none"
 
     # 新增: 统一能力发现
     features: list[ModelFeature] = field(default_factory=list)
@@ -59,10 +88,14 @@ class ModelCapabilities:
     # 新增: 变体映射
     variants: dict[str, str] = field(default_factory=dict)
 
+    # 参数 / 模态集合 (构造时计算一次，成员判断为 O(1))
+    _parameter_set: frozenset[str] = field(init=False, repr=False, compare=False)
+    _modality_set: frozenset[str] = field(init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
         """根据 supported_parameters 和 input_modalities 推断能力"""
-        params = set(self.supported_parameters)
-        modalities = set(self.input_modalities)
+        params = self._parameter_set = frozenset(self.supported_parameters)
+        modalities = self._modality_set = frozenset(self.input_modalities)
 
         # 推断布尔字段 (向后兼容)
         self.supports_reasoning = "reasoning" in params
@@ -74,20 +107,10 @@ class ModelCapabilities:
         self.supports_video = "video" in modalities
 
         # 推断 features (新 API)
-        if "reasoning" in params and ModelFeature.REASONING not in self.features:
-            self.features.append(ModelFeature.REASONING)
-        if "tools" in params and ModelFeature.TOOL_CALL not in self.features:
-            self.features.append(ModelFeature.TOOL_CALL)
-        if "structured_outputs" in params and ModelFeature.STRUCTURED_OUTPUT not in self.features:
-            self.features.append(ModelFeature.STRUCTURED_OUTPUT)
-        if "image" in modalities and ModelFeature.VISION not in self.features:
-            self.features.append(ModelFeature.VISION)
-        if "file" in modalities and ModelFeature.DOCUMENT not in self.features:
-            self.features.append(ModelFeature.DOCUMENT)
-        if "audio" in modalities and ModelFeature.AUDIO not in self.features:
-            self.features.append(ModelFeature.AUDIO)
-        if "video" in modalities and ModelFeature.VIDEO not in self.features:
-            self.features.append(ModelFeature.VIDEO)
+        for values, table in ((params, _PARAMETER_FEATURES), (modalities, _MODALITY_FEATURES)):
+            for value, feature in table:
+                if value in values and feature not in self.features:
+                    self.features.append(feature)
 
         # 同步 pricing (如果未设置)
         if self.pricing is None and (self.pricing_prompt or self.pricing_completion):
@@ -99,14 +122,7 @@ class ModelCapabilities:
 
         # 推断思考模式类型
         if self.supports_reasoning:
-            if "gemini" in self.model_id.lower():
-                self.reasoning_type = "max_tokens"
-            elif any(x in self.model_id.lower() for x in ["o1", "o3", "gpt-5"]):
-                self.reasoning_type = "effort"
-            elif "anthropic" in self.model_id.lower() or "deepseek" in self.model_id.lower():
-                self.reasoning_type = "max_tokens"
-            else:
-                self.reasoning_type = "effort"
+            self.reasoning_type = _infer_reasoning_type(self.model_id)
 
     def has_feature(self, feature: ModelFeature) -> bool:
         """检查是否支持某能力 (推荐 API)"""
@@ -412,7 +428,7 @@ def is_parameter_supported(model_id: str, parameter: str) -> bool:
     """检查模型是否支持某个参数"""
     caps = get_model_capabilities(model_id)
     if caps:
-        return parameter in caps.supported_parameters
+        return parameter in caps._parameter_set
     return True  # 未知模型默认支持
 
 
@@ -420,7 +436,7 @@ def get_supported_modalities(model_id: str) -> set[str]:
     """获取模型支持的输入模态"""
     caps = get_model_capabilities(model_id)
     if caps:
-        return set(caps.input_modalities)
+        return set(caps._modality_set)
     return {"text"}  # 未知模型默认只支持文本
 
 
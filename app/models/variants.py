@@ -19,6 +19,8 @@ class ModelVariant(str, Enum):
     PRECISE = "precise"
 
 
+# 可在运行时扩展或覆盖 (如 DEFAULT_VARIANT_MAPPINGS["dashscope"]["fast"] = "qwen-flash")，
+# resolve_variant 每次直接查询，修改立即生效
 DEFAULT_VARIANT_MAPPINGS: dict[str, dict[str, str]] = {
     "openrouter": {
         "fast": "google/gemini-2.5-flash-lite-preview-09-2025",
@@ -72,9 +74,8 @@ DEFAULT_VARIANT_MAPPINGS: dict[str, dict[str, str]] = {
 
 
 def resolve_variant(provider: str, variant: ModelVariant, fallback: str) -> str:
-    """解析变体到具体模型 ID"""
-    mappings = DEFAULT_VARIANT_MAPPINGS.get(provider, {})
-    model_id = mappings.get(variant.value)
+    """解析变体到具体模型 ID (未映射时使用 fallback)"""
+    model_id = DEFAULT_VARIANT_MAPPINGS.get(provider, {}).get(variant.value)
 
     if model_id:
         logger.debug("Resolved variant %s/%s -> %s", provider, variant.value, model_id)
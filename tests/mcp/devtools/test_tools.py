@@ -12,11 +12,16 @@ import pytest
 from app.mcp.devtools.tools import (
     AppType,
     DetailLevel,
+    RunResult,
+    SessionInfo,
+    SessionsResult,
     SessionStatus,
+    TraceResult,
     agno_list,
     agno_run,
     agno_sessions,
     agno_trace,
+    dump_result,
 )
 
 
@@ -327,3 +332,46 @@ class TestAgnoSessions:
         # Assert
         assert result.error is not None
         assert "connection failed" in result.error.lower()
+
+
+class TestDumpResult:
+    """Tests for MCP result serialization."""
+
+    def test_dump_omits_none_fields(self):
+        # Arrange
+        result = RunResult(status="ERROR", error="boom")
+
+        # Act
+        data = dump_result(result)
+
+        # Assert
+        assert data == {"status": "ERROR", "error": "boom"}
+
+    def test_dump_nested_sessions(self):
+        # Arrange
+        result = SessionsResult(sessions=[SessionInfo("sess-1", "wf-1", "workflow", "2026-01-12")])
+
+        # Act
+        data = dump_result(result)
+
+        # Assert
+        assert data == {
+            "sessions": [
+                {
+                    "session_id": "sess-1",
+                    "app_id": "wf-1",
+                    "app_type": "workflow",
+                    "created_at": "2026-01-12",
+                }
+            ]
+        }
+
+    def test_dump_trace_keeps_status(self):
+        # Arrange
+        result = TraceResult(session_id="sess-1", status=SessionStatus.RUNNING)
+
+        # Act
+        data = dump_result(result)
+
+        # Assert
+        assert data == {"session_id": "sess-1", "status": SessionStatus.RUNNING}
@@ -5,7 +5,38 @@
     pytest tests/test_models.py -v
 """
 
+import asyncio
+import dataclasses
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from agno.models.message import Message
+
+from app.models import adapters, factory, provider_registry
+from app.models.adapters import dashscope, native, volcengine
+from app.models.adapters._json import attach_parsed, sse_encode
+from app.models.adapters._pool import aclose_shared_http_client, shared_async_http_client
+from app.models.adapters._singleflight import AsyncSingleFlight, SingleFlight, request_key
+from app.models.adapters._stream import (
+    acoalesce_chunks,
+    acoalesce_stream,
+    coalesce_chunks,
+    coalesce_stream,
+)
+from app.models.adapters.base import load_model_class
+from app.models.adapters.dashscope import DashScopeModel, _base_params
+from app.models.adapters.gateway import GatewayAdapter
+from app.models.adapters.native import _ANTHROPIC_PARAM_MAP, NativeAdapter, select_params
+from app.models.adapters.volcengine import VolcengineAdapter, VolcengineModel
 from app.models.config import (
+    DEFAULT_REASONING_CONFIG,
     KnowledgeConfig,
     MemoryConfig,
     ModelConfig,
@@ -13,6 +44,60 @@ from app.models.config import (
     ReasoningConfig,
     WebSearchConfig,
 )
+from app.models.factory import _preset_config
+from app.models.features import ModelFeature
+from app.models.parallel import first_completed_chat, multi_chat
+from app.models.pricing import ModelPricing
+from app.models.provider_registry import (
+    FIFOCache,
+    ProviderRegistry,
+    _builtin_adapter,
+    get_registry,
+    register_adapter,
+)
+from app.models.registry import (
+    MODEL_REGISTRY,
+    ModelCapabilities,
+    get_supported_modalities,
+    is_parameter_supported,
+)
+from app.models.variants import DEFAULT_VARIANT_MAPPINGS, ModelVariant, resolve_variant
+
+
+@pytest.fixture
+def dashscope_model(monkeypatch):
+    """
+    通过真实构造函数创建 DashScopeModel 的工厂
+
+    dashscope SDK 替换为只含所需接口的假模块 (Aio* 默认为 None，即走线程池兜底)；
+    传入 openai_client / async_openai_client 时替换 OpenAI 兼容客户端，其余参数传给 ModelConfig。
+    """
+
+    def build(
+        model_id="qwen-plus",
+        generation=None,
+        aio_generation=None,
+        openai_client=None,
+        async_openai_client=None,
+        **config_kwargs,
+    ):
+        sdk = SimpleNamespace(
+            api_key=None,
+            Generation=generation,
+            MultiModalConversation=None,
+            AioGeneration=aio_generation,
+            AioMultiModalConversation=None,
+        )
+        monkeypatch.setattr(dashscope, "_load_dashscope", lambda: sdk)
+        if openai_client is not None:
+            monkeypatch.setattr("openai.OpenAI", lambda **kwargs: openai_client)
+        if async_openai_client is not None:
+            monkeypatch.setattr("openai.AsyncOpenAI", lambda **kwargs: async_openai_client)
+
+        config = ModelConfig(provider=ModelProvider.DASHSCOPE, model_id=model_id, **config_kwargs)
+        return DashScopeModel(model_id, "sk-test", config)
+
+    return build
 
 
 class TestModelConfig:
@@ -72,6 +157,57 @@ class TestModelConfig:
         params = web_search.to_openrouter_params()
         assert "plugins" in params
 
+    def test_config_is_frozen(self):
+        """测试配置不可变且可哈希"""
+        config = ModelConfig(reasoning=ReasoningConfig(enabled=True))
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.temperature = 0.5  # type: ignore[misc]
+        assert hash(config) == hash(ModelConfig(reasoning=ReasoningConfig(enabled=True)))
+        assert dataclasses.replace(config, temperature=0.5).temperature == 0.5
+
+    def test_default_sub_configs_shared(self):
+        """测试未指定的子配置共享同一默认实例"""
+        assert ModelConfig().reasoning is DEFAULT_REASONING_CONFIG
+        assert ModelConfig(temperature=0.5).reasoning is ModelConfig().reasoning
+
+    def test_params_follow_replace(self):
+        """测试参数每次按当前配置构建 (返回新 dict，replace 后反映新值)"""
+        config = ModelConfig(provider=ModelProvider.OPENAI, temperature=0.2)
+        params = config.to_provider_params()
+        params["temperature"] = 1.0
+
+        assert config.to_provider_params() == {"temperature": 0.2}
+        assert dataclasses.replace(config, top_p=0.9).get_common_params() == {
+            "temperature": 0.2,
+            "top_p": 0.9,
+        }
+
+    def test_provider_params_fresh_dicts(self):
+        """测试厂商参数每次构建新的 dict，修改结果 (含嵌套 dict) 不影响后续调用"""
+        reasoning = ReasoningConfig(enabled=True, effort="high")
+        params = reasoning.to_provider_params(ModelProvider.OPENAI)
+        params["mutated"] = True
+
+        assert reasoning.to_provider_params(ModelProvider.OPENAI) == {"reasoning_effort": "high"}
+
+        thinking = ReasoningConfig(enabled=True, max_tokens=2048)
+        thinking.to_provider_params(ModelProvider.ANTHROPIC)["thinking"]["budget_tokens"] = 1
+        assert thinking.to_provider_params(ModelProvider.ANTHROPIC)["thinking"] == {
+            "type": "enabled",
+            "budget_tokens": 2048,
+        }
+
+        config = ModelConfig(
+            provider=ModelProvider.VOLCENGINE, reasoning=ReasoningConfig(enabled=True)
+        )
+        config.to_provider_params()["thinking"]["type"] = "mutated"
+        assert config.to_provider_params()["thinking"]["type"] != "mutated"
+
+        web_search = WebSearchConfig(enabled=True, volcengine_sources=["toutiao"])
+        tool = web_search.to_provider_params(ModelProvider.VOLCENGINE)["tools"][0]
+        assert tool["sources"] == ["toutiao"]
+
 
 class TestMemoryConfig:
     """MemoryConfig 单元测试"""
@@ -125,3 +261,1057 @@ class TestKnowledgeConfig:
 
         params = knowledge.to_agent_params()
         assert params.get("add_knowledge_to_context") is True
+
+
+class TestApiKeyResolution:
+    """API Key 解析单元测试"""
+
+    def test_priority_uncached(self, monkeypatch):
+        """测试三层优先级，修改环境变量 (含轮换 API Key) 后立即生效"""
+        adapter = VolcengineAdapter()
+        config = ModelConfig(provider=ModelProvider.VOLCENGINE, api_key_env="TEST_AGENT_KEY")
+        monkeypatch.delenv("TEST_AGENT_KEY", raising=False)
+        monkeypatch.delenv("ARK_API_KEY", raising=False)
+
+        assert adapter.get_api_key(config) is None
+
+        monkeypatch.setenv("ARK_API_KEY", "global-key")
+        assert adapter.get_api_key(config) == "global-key"
+
+        monkeypatch.setenv("ARK_API_KEY", "rotated-key")
+        assert adapter.get_api_key(config) == "rotated-key"
+
+        monkeypatch.setenv("TEST_AGENT_KEY", "agent-key")
+        assert adapter.get_api_key(config) == "agent-key"
+
+    def test_ollama_host_resolution(self, monkeypatch):
+        """测试 Ollama Host 优先级，修改环境变量后立即生效"""
+        adapter = NativeAdapter("ollama")
+        config = ModelConfig(provider=ModelProvider.OLLAMA, ollama_host_env="TEST_OLLAMA_HOST")
+        monkeypatch.delenv("TEST_OLLAMA_HOST", raising=False)
+        monkeypatch.delenv("OLLAMA_HOST", raising=False)
+
+        assert adapter._get_ollama_host(config) == config.ollama_host
+
+        monkeypatch.setenv("OLLAMA_HOST", "http://cpu:11434")
+        assert adapter._get_ollama_host(config) == "http://cpu:11434"
+
+        monkeypatch.setenv("TEST_OLLAMA_HOST", "http://gpu:11434")
+        assert adapter._get_ollama_host(config) == "http://gpu:11434"
+
+
+class TestProviderRegistry:
+    """Provider 注册表单元测试"""
+
+    def test_adapter_loaded_once(self):
+        """测试每个 Provider 的 Adapter 按需创建一次，重置注册表后仍复用"""
+        adapter = get_registry().get_adapter(ModelProvider.OLLAMA)
+        ProviderRegistry.reset_instance()
+
+        assert get_registry().get_adapter(ModelProvider.OLLAMA) is adapter
+        assert adapter.provider_id == "ollama"
+        assert set(get_registry().list_adapters()) == {p.value for p in ModelProvider}
+
+    def test_cache_key(self):
+        """测试缓存 Key 不含 API Key 明文，且相同参数结果稳定"""
+        adapter = get_registry().get_adapter(ModelProvider.OPENAI)
+        config = ModelConfig(provider=ModelProvider.OPENAI, model_id="gpt-4o")
+
+        key = adapter.get_cache_key(config, "sk-secret")
+
+        assert key.startswith("openai:gpt-4o:")
+        assert "sk-secret" not in key
+        assert adapter.get_cache_key(config, "sk-secret") == key
+        assert adapter.get_cache_key(config, "sk-other") != key
+
+    def test_load_model_class(self):
+        """测试模型类导入结果被缓存，缺少依赖时给出安装提示"""
+        first = load_model_class("collections", "OrderedDict", "collections")
+
+        assert load_model_class("collections", "OrderedDict", "collections") is first
+        with pytest.raises(ImportError, match="pip install missing-sdk"):
+            load_model_class("missing_sdk_module", "Model", "missing-sdk")
+
+    def test_select_params(self):
+        """测试按参数表提取参数，跳过 None 和空列表，保留 0"""
+        config = ModelConfig(temperature=0.0, top_k=40, stop=[])
+
+        assert select_params(config, _ANTHROPIC_PARAM_MAP) == {"temperature": 0.0, "top_k": 40}
+
+    def test_ollama_options(self, monkeypatch):
+        """测试 Ollama 运行参数放入 options，keep_alive 单独传递"""
+        monkeypatch.setattr(native, "load_model_class", lambda *args: lambda **params: params)
+        config = ModelConfig(
+            provider=ModelProvider.OLLAMA,
+            temperature=0.2,
+            ollama_num_ctx=8192,
+            ollama_num_batch=1024,
+            ollama_keep_alive=-1,
+        )
+
+        params = native.NativeAdapter("ollama")._create_ollama(config, None)
+
+        assert params["options"] == {"temperature": 0.2, "num_ctx": 8192, "num_batch": 1024}
+        assert params["keep_alive"] == -1
+        assert "keep_alive" not in native.NativeAdapter("ollama")._create_ollama(
+            ModelConfig(), None
+        )
+
+    def test_get_models_batch(self, monkeypatch):
+        """测试批量获取按输入顺序返回，批次内相同配置只解析一次"""
+        ProviderRegistry.reset_instance()
+        registry = get_registry()
+        calls = []
+
+        def get_model(config, project_config=None, variant=None):
+            calls.append(config.model_id)
+            return config.model_id
+
+        monkeypatch.setattr(registry, "get_model", get_model)
+        a = ModelConfig(model_id="a")
+        b = ModelConfig(model_id="b", stop=["x"])
+
+        assert registry.get_models([a, b, ModelConfig(model_id="a"), b]) == ["a", "b", "a", "b"]
+        assert calls == ["a", "b", "b"]
+        ProviderRegistry.reset_instance()
+
+    def test_fifo_cache_eviction(self):
+        """测试缓存满时淘汰最早写入的项，并统计命中"""
+        cache = FIFOCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == (True, 1)
+
+        cache.set("c", 3)
+
+        assert cache.get("a") == (False, None)
+        assert cache.get("c") == (True, 3)
+        assert cache.cache_info() == {"hits": 2, "misses": 1, "size": 2, "maxsize": 2}
+
+    def test_get_registry_singleton(self):
+        """测试 get_registry 返回单例，cache_size 仅在首次创建时生效"""
+        ProviderRegistry.reset_instance()
+        registry = get_registry(cache_size=5)
+
+        assert get_registry(cache_size=50) is registry
+        assert registry.cache_info()["maxsize"] == 5
+        ProviderRegistry.reset_instance()
+
+    def test_register_adapter(self, monkeypatch):
+        """测试装饰器注册的 Adapter 工厂覆盖内置工厂"""
+        monkeypatch.setattr(
+            provider_registry, "_ADAPTER_FACTORIES", dict(provider_registry._ADAPTER_FACTORIES)
+        )
+
+        @register_adapter(ModelProvider.OLLAMA)
+        def _custom(provider):
+            return GatewayAdapter(provider.value)
+
+        try:
+            adapter = get_registry().get_adapter(ModelProvider.OLLAMA)
+            assert isinstance(adapter, GatewayAdapter)
+            assert adapter.provider_id == "ollama"
+        finally:
+            _builtin_adapter.cache_clear()
+
+
+class TestFactoryPresets:
+    """便捷函数预设单元测试"""
+
+    def test_preset_config(self):
+        """测试预设字段与调用参数合并，按需构建嵌套配置"""
+        config = _preset_config(
+            "gemini_pro", temperature=0.3, reasoning_enabled=True, reasoning_effort="high"
+        )
+
+        assert config == ModelConfig(
+            model_id="google/gemini-3-pro-preview",
+            temperature=0.3,
+            reasoning=ReasoningConfig(enabled=True, effort="high"),
+        )
+        assert _preset_config("dashscope_qwen", model_id="qwen-max").provider == (
+            ModelProvider.DASHSCOPE
+        )
+
+    def test_create_model_from_dict(self, monkeypatch):
+        """测试从字典构建配置，不修改传入的字典"""
+        monkeypatch.setattr(factory, "create_model", lambda config: config)
+        config_dict = {
+            "provider": "openai",
+            "model_id": "gpt-4o",
+            "reasoning": {"enabled": True, "effort": "low"},
+        }
+        snapshot = {**config_dict, "reasoning": dict(config_dict["reasoning"])}
+
+        config = factory.create_model_from_dict(config_dict)
+
+        assert config.provider is ModelProvider.OPENAI
+        assert config.reasoning == ReasoningConfig(enabled=True, effort="low")
+        assert config_dict == snapshot
+
+    def test_create_model_from_dict_flat(self, monkeypatch):
+        """测试没有嵌套配置时直接使用默认子配置"""
+        monkeypatch.setattr(factory, "create_model", lambda config: config)
+        config_dict = {"provider": "openai", "model_id": "gpt-4o", "temperature": 0.1}
+
+        config = factory.create_model_from_dict(config_dict)
+
+        assert config.provider is ModelProvider.OPENAI
+        assert config.temperature == 0.1
+        assert config.reasoning is DEFAULT_REASONING_CONFIG
+        assert config_dict["provider"] == "openai"
+
+    def test_preset_config_reused(self):
+        """测试参数相同的预设调用复用同一个配置实例"""
+        first = _preset_config("claude_sonnet", temperature=0.2, max_tokens=8192)
+        second = _preset_config("claude_sonnet", temperature=0.2, max_tokens=8192)
+
+        assert first is second
+        assert _preset_config("claude_sonnet", temperature=0.5, max_tokens=8192) is not first
+
+
+class TestModelPricing:
+    """模型定价单元测试"""
+
+    def test_estimate_cost(self):
+        """测试按预计算的每 token 单价估算成本"""
+        pricing = ModelPricing.from_per_million(3.0, 15.0)
+
+        assert pricing.estimate_cost(1000, 2000) == Decimal("0.033")
+        assert ModelPricing.from_per_million(3.0, 15.0) is pricing
+        assert pricing == ModelPricing(input=Decimal("3.0"), output=Decimal("15.0"))
+
+
+class TestDashScopeBatching:
+    """DashScope 批量 prompt 单元测试"""
+
+    def test_batched_prompt_numbers_tuples(self):
+        """测试批量 prompt 按编号枚举"""
+        prompt = DashScopeModel._build_batched_prompt(["foo", "bar"])
+
+        assert "### Tuple 1\nfoo" in prompt
+        assert "### Tuple 2\nbar" in prompt
+
+    def test_batched_output_restores_order(self):
+        """测试按 tuple 编号还原输出顺序"""
+        text = '{"results": [{"id": 2, "output": "b"}, {"id": 1, "output": "a"}]}'
+
+        assert DashScopeModel._parse_batched_output(text, 2) == ["a", "b"]
+
+    def test_batched_output_missing_tuple(self):
+        """测试缺失 tuple 时抛出异常"""
+        with pytest.raises(RuntimeError):
+            DashScopeModel._parse_batched_output('{"results": [{"id": 1, "output": "a"}]}', 2)
+
+
+class TestDashScopeFileCache:
+    """DashScope 文件上传缓存单元测试"""
+
+    def test_same_content_uploads_once(self, tmp_path, dashscope_model):
+        """测试相同内容的文件只上传一次"""
+        uploads = []
+
+        def create(file, purpose):
+            uploads.append(purpose)
+            return SimpleNamespace(id=f"file-{len(uploads)}")
+
+        model = dashscope_model(openai_client=SimpleNamespace(files=SimpleNamespace(create=create)))
+
+        first = tmp_path / "a.pdf"
+        second = tmp_path / "b.pdf"
+        first.write_bytes(b"%PDF-1.4 same")
+        second.write_bytes(b"%PDF-1.4 same")
+
+        assert model.upload_file(str(first)) == "file-1"
+        assert model.upload_file(str(second)) == "file-1"
+        assert len(uploads) == 1
+
+    def test_unchanged_file_not_rehashed_and_ttl(self, tmp_path, monkeypatch, dashscope_model):
+        """测试文件未变化时不重新计算 sha256，file_id 过期后重新上传"""
+        hashed = []
+        real_digest = dashscope._file_digest
+        monkeypatch.setattr(
+            dashscope, "_file_digest", lambda path: hashed.append(path) or real_digest(path)
+        )
+
+        uploads = []
+
+        def create(file, purpose):
+            uploads.append(purpose)
+            return SimpleNamespace(id=f"file-{len(uploads)}")
+
+        model = dashscope_model(openai_client=SimpleNamespace(files=SimpleNamespace(create=create)))
+
+        pdf = tmp_path / "a.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+
+        assert model.upload_file(str(pdf)) == "file-1"
+        assert model.upload_file(str(pdf)) == "file-1"
+        assert len(hashed) == 1
+
+        monkeypatch.setattr(dashscope, "_FILE_ID_TTL", 0)
+        assert model.upload_file(str(pdf)) == "file-2"
+
+    @pytest.mark.asyncio
+    async def test_achat_with_pdf(self, tmp_path, dashscope_model):
+        """测试异步文档问答先在线程池中上传 (按内容去重)，再用 AsyncOpenAI 提问"""
+        uploads = []
+        queries = []
+
+        def upload(file, purpose):
+            uploads.append(purpose)
+            return SimpleNamespace(id="file-1")
+
+        async def create(model, messages):
+            queries.append((model, messages[0]["content"]))
+            usage = SimpleNamespace(prompt_tokens=3, completion_tokens=2, total_tokens=5)
+            message = SimpleNamespace(content=messages[1]["content"])
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+        model = dashscope_model(
+            openai_client=SimpleNamespace(files=SimpleNamespace(create=upload)),
+            async_openai_client=SimpleNamespace(
+                chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+            ),
+        )
+
+        pdf = tmp_path / "a.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        first = await model.achat_with_pdf(str(pdf), "总结")
+        await model.achat_with_pdf(str(pdf), "要点")
+
+        assert first["content"] == "总结"
+        assert first["usage"]["total_tokens"] == 5
+        assert uploads == ["file-extract"]
+        assert queries == [("qwen-long", "fileid://file-1")] * 2
+
+    @pytest.mark.asyncio
+    async def test_achat_with_pdfs(self, dashscope_model):
+        """测试多个文档并发处理，单个失败不影响其他文档"""
+        model = dashscope_model()
+
+        async def achat_with_pdf(file_path, query, model_id):
+            if file_path == "bad.pdf":
+                raise FileNotFoundError(file_path)
+            return {"content": f"{file_path}:{query}"}
+
+        model.achat_with_pdf = achat_with_pdf
+
+        results = await model.achat_with_pdfs(
+            [("a.pdf", "总结"), ("bad.pdf", "总结"), ("b.pdf", "要点")], max_concurrency=2
+        )
+
+        assert results[0] == {"content": "a.pdf:总结"}
+        assert isinstance(results[1], FileNotFoundError)
+        assert results[2] == {"content": "b.pdf:要点"}
+
+    @pytest.mark.asyncio
+    async def test_aclose_releases_clients(self, dashscope_model):
+        """测试 async with 退出时丢弃客户端 (之后重新创建)，不关闭共享连接池"""
+        model = dashscope_model()
+        client = model._get_openai_client()
+        async_client = model._get_async_openai_client()
+
+        async with model:
+            pass
+
+        assert model._get_openai_client() is not client
+        assert model._get_async_openai_client() is not async_client
+        assert not shared_async_http_client().is_closed
+
+    def test_async_openai_client_per_loop(self, dashscope_model):
+        """测试 AsyncOpenAI 客户端按事件循环缓存，多次 asyncio.run 不复用已关闭循环的连接池"""
+        model = dashscope_model()
+
+        async def get_twice():
+            client = model._get_async_openai_client()
+            assert model._get_async_openai_client() is client
+            return client
+
+        first = asyncio.run(get_twice())
+        second = asyncio.run(get_twice())
+
+        assert first is not second
+        assert first._client is not second._client
+
+    @pytest.mark.asyncio
+    async def test_shared_async_http_client(self):
+        """测试同一事件循环内共享 AsyncClient，关闭后重新创建"""
+        client = shared_async_http_client()
+        assert shared_async_http_client() is client
+
+        await aclose_shared_http_client()
+
+        assert client.is_closed
+        assert shared_async_http_client() is not client
+        await aclose_shared_http_client()
+
+
+class TestDashScopeStream:
+    """DashScope 流式响应单元测试"""
+
+    def test_usage_only_on_final_chunk(self, dashscope_model):
+        """测试 usage 只在收尾 chunk 上产出"""
+
+        def chunk(text, output_tokens):
+            return SimpleNamespace(
+                status_code=200,
+                output=SimpleNamespace(text=text),
+                usage=SimpleNamespace(input_tokens=5, output_tokens=output_tokens),
+            )
+
+        model = dashscope_model()
+        chunks = list(model._handle_stream([chunk("Hel", 1), chunk("lo", 2)]))
+
+        assert [c["content"] for c in chunks] == ["Hel", "lo", ""]
+        assert all("usage" not in c for c in chunks[:-1])
+        assert chunks[-1]["usage"] == {"prompt_tokens": 5, "completion_tokens": 2}
+
+    def test_raw_only_when_requested(self, dashscope_model):
+        """测试流式 chunk 默认不携带 raw，include_raw=True 时携带"""
+        response = SimpleNamespace(
+            status_code=200,
+            output=SimpleNamespace(text="hi"),
+            usage=SimpleNamespace(input_tokens=1, output_tokens=1),
+        )
+
+        model = dashscope_model()
+
+        assert all("raw" not in c for c in model._handle_stream([response]))
+        assert all(c["raw"] is response for c in model._handle_stream([response], True))
+
+    def test_handle_response_message_format(self, dashscope_model):
+        """测试 message 格式的非流式响应解析"""
+        message = SimpleNamespace(content="你好")
+        response = SimpleNamespace(
+            status_code=200,
+            output=SimpleNamespace(choices=[SimpleNamespace(message=message)]),
+            usage=SimpleNamespace(input_tokens=3, output_tokens=2, total_tokens=5),
+        )
+
+        result = dashscope_model()._handle_response(response)
+
+        assert result["content"] == "你好"
+        assert result["usage"] == {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}
+
+    def test_coalesce_merges_chunks(self):
+        """测试流式 chunk 合并且保留收尾 usage"""
+        chunks = [{"content": c, "raw": i} for i, c in enumerate("abcde")]
+        chunks.append({"content": "", "usage": {"completion_tokens": 5}, "raw": 5})
+
+        merged = list(coalesce_chunks(iter(chunks), max_delay=60, max_chunks=3))
+
+        assert [c["content"] for c in merged] == ["a", "bcd", "e", ""]
+        assert merged[1]["raw"] == 3
+        assert merged[-1]["usage"] == {"completion_tokens": 5}
+
+    def test_coalesce_merges_reasoning_by_size(self):
+        """测试按字符数合并并拼接 reasoning"""
+        chunks = [
+            {"content": "", "reasoning": "嗯", "raw": 0},
+            {"content": "", "reasoning": "想", "raw": 1},
+            {"content": "", "reasoning": "一想", "raw": 2},
+            {"content": "abcd", "raw": 3},
+        ]
+
+        merged = list(coalesce_chunks(iter(chunks), max_delay=60, max_chars=3))
+
+        assert merged == [
+            {"content": "", "reasoning": "嗯", "raw": 0},
+            {"content": "", "reasoning": "想一想", "raw": 2},
+            {"content": "abcd", "raw": 3},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_acoalesce_flushes_on_deadline(self):
+        """测试异步合并首个 chunk 立即产出，上游停顿时按截止时间冲刷缓冲区"""
+        flushed = asyncio.Event()
+
+        async def source():
+            for text in "abc":
+                yield {"content": text}
+            await flushed.wait()
+            yield {"content": "d"}
+            yield {"content": "", "usage": {"completion_tokens": 4}}
+
+        merged = []
+        async for chunk in acoalesce_chunks(source(), max_delay=0.01):
+            merged.append(chunk["content"])
+            if merged == ["a", "bc"]:
+                flushed.set()
+
+        assert merged == ["a", "bc", "d", ""]
+
+    def test_coalesce_disabled_by_default(self):
+        """测试默认不合并，chunk 原样返回"""
+        config = ModelConfig(provider=ModelProvider.DASHSCOPE)
+        chunks = iter([{"content": "a"}])
+
+        assert config.stream_coalesce_ms == 0
+        assert coalesce_stream(chunks, config.stream_coalesce_ms) is chunks
+        assert acoalesce_stream(chunks, config.stream_coalesce_ms) is chunks
+
+
+class TestDashScopeAsync:
+    """DashScope 异步调用单元测试"""
+
+    @staticmethod
+    def _response(text):
+        return SimpleNamespace(
+            status_code=200,
+            output=SimpleNamespace(text=text),
+            usage=SimpleNamespace(input_tokens=1, output_tokens=1, total_tokens=2),
+        )
+
+    @pytest.mark.asyncio
+    async def test_achat_uses_aio_generation(self, dashscope_model):
+        """测试异步非流式调用使用 AioGeneration，相同的在途请求只发送一次"""
+        calls = []
+
+        async def call(**params):
+            calls.append(params)
+            await asyncio.sleep(0)
+            return self._response("ok")
+
+        model = dashscope_model(aio_generation=SimpleNamespace(call=call), dedupe_requests=True)
+        messages = [{"role": "user", "content": "hi"}]
+
+        results = await asyncio.gather(model.achat(messages), model.achat(messages))
+
+        assert [r["content"] for r in results] == ["ok", "ok"]
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_achat_stream(self, dashscope_model):
+        """测试异步流式调用产出增量 chunk 和收尾 usage"""
+
+        async def events():
+            for text in ("你", "好"):
+                yield self._response(text)
+
+        async def call(**params):
+            assert params["stream"] is True
+            return events()
+
+        model = dashscope_model(aio_generation=SimpleNamespace(call=call))
+
+        stream = await model.achat([{"role": "user", "content": "hi"}], stream=True)
+        chunks = [c async for c in stream]
+
+        assert [c["content"] for c in chunks] == ["你", "好", ""]
+        assert chunks[-1]["usage"] == {"prompt_tokens": 1, "completion_tokens": 1}
+
+    @pytest.mark.asyncio
+    async def test_achat_falls_back_to_thread(self, dashscope_model):
+        """测试 SDK 没有异步接口时在线程池中执行同步调用"""
+        model = dashscope_model(
+            generation=SimpleNamespace(
+                call=lambda **params: (
+                    iter([self._response("a"), self._response("b")])
+                    if params.get("stream")
+                    else self._response("ok")
+                )
+            )
+        )
+        messages = [{"role": "user", "content": "hi"}]
+
+        result = await model.achat(messages)
+        stream = await model.achat(messages, stream=True)
+
+        assert result["content"] == "ok"
+        assert [c["content"] async for c in stream] == ["a", "b", ""]
+
+
+class TestDashScopePromptCache:
+    """DashScope 提示词缓存单元测试"""
+
+    @staticmethod
+    def _build(dashscope_model, prompt_cache: bool, system: str):
+        model = dashscope_model(prompt_cache=prompt_cache)
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": "hi"}]
+        return messages, model._build_params(messages)["messages"]
+
+    def test_long_system_prompt_marked(self, dashscope_model):
+        """测试较长的 system prompt 附加 cache_control"""
+        messages, built = self._build(dashscope_model, True, "x" * 5000)
+
+        assert built[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert built[1] is messages[1]
+        assert isinstance(messages[0]["content"], str)
+
+    def test_disabled_or_short_prompt_unchanged(self, dashscope_model):
+        """测试未开启或 prompt 较短时不修改消息"""
+        messages, built = self._build(dashscope_model, False, "x" * 5000)
+        assert built is messages
+
+        messages, built = self._build(dashscope_model, True, "short")
+        assert built[0] is messages[0]
+
+    def test_base_params_shared(self):
+        """测试相同配置共享只读的固定参数模板，不可哈希配置直接构建"""
+        config = ModelConfig(provider=ModelProvider.DASHSCOPE, temperature=0.3, top_k=20)
+        params = _base_params("qwen-plus", config)
+
+        assert params is _base_params("qwen-plus", config)
+        assert dict(params) == {"model": "qwen-plus", "temperature": 0.3, "top_k": 20}
+        with pytest.raises(TypeError):
+            params["seed"] = 1  # type: ignore[index]
+
+        unhashable = ModelConfig(provider=ModelProvider.DASHSCOPE, stop=["\n"])
+        assert _base_params("qwen-plus", unhashable)["stop"] == ["\n"]
+
+
+class TestStructuredOutputParsing:
+    """结构化输出解析单元测试"""
+
+    def test_attach_parsed(self):
+        """测试解析 JSON content 写入 parsed"""
+        assert attach_parsed({"content": '{"a": 1}'})["parsed"] == {"a": 1}
+
+    def test_attach_parsed_invalid(self):
+        """测试非法 JSON 时 parsed 为 None"""
+        assert attach_parsed({"content": "not json"})["parsed"] is None
+        assert attach_parsed({"content": None})["parsed"] is None
+
+    def test_sse_encode_strips_raw(self):
+        """测试 SSE 编码去掉 raw 字段，保留中文原文"""
+        chunk = {"content": "你好", "raw": object()}
+        encoded = sse_encode(chunk)
+
+        assert encoded.startswith(b"data: ")
+        assert encoded.endswith(b"\n\n")
+        assert json.loads(encoded[6:]) == {"content": "你好"}
+        assert "raw" in chunk
+
+
+class TestSingleFlight:
+    """Single-flight 请求合并单元测试"""
+
+    def test_concurrent_calls_share_result(self):
+        """测试相同 key 的并发调用只执行一次"""
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def fn():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return {"content": "ok"}
+
+        key = request_key([{"role": "user", "content": "hi"}])
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            first = pool.submit(flight.do, key, fn)
+            started.wait()
+            others = [pool.submit(flight.do, key, fn) for _ in range(3)]
+            results = [first.result(), *(f.result() for f in others)]
+
+        assert len(calls) == 1
+        assert all(r == {"content": "ok"} for r in results)
+
+        results[1]["parsed"] = {}
+        assert all("parsed" not in r for r in results[2:])
+
+    @pytest.mark.asyncio
+    async def test_async_leader_cancel_not_propagated(self):
+        """测试执行方被取消时等待方不跟着取消，而是重新发起调用"""
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+            return {"content": "ok"}
+
+        leader = asyncio.create_task(flight.do("k", fn))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do("k", fn)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        results = await asyncio.gather(*followers)
+
+        assert leader.cancelled()
+        assert len(calls) == 2
+        assert results == [{"content": "ok"}] * 2
+        assert results[0] is not results[1]
+
+    def test_leader_result_not_copied_without_followers(self):
+        """测试没有等待方时直接返回原结果，不做复制"""
+        result = {"content": "ok"}
+
+        async def afn():
+            return result
+
+        assert SingleFlight().do("k", lambda: result) is result
+        assert asyncio.run(AsyncSingleFlight().do("k", afn)) is result
+
+    def test_uncopyable_result_does_not_block_followers(self):
+        """测试结果无法复制时等待方收到异常，不会一直阻塞"""
+
+        class Uncopyable:
+            def __deepcopy__(self, memo):
+                raise TypeError("cannot copy")
+
+        flight = SingleFlight()
+        started = threading.Event()
+        result = Uncopyable()
+
+        def fn():
+            started.set()
+            time.sleep(0.05)
+            return result
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "k", fn)
+            started.wait()
+            follower = pool.submit(flight.do, "k", fn)
+
+            assert leader.result(timeout=1) is result
+            with pytest.raises(TypeError):
+                follower.result(timeout=1)
+
+    def test_async_calls_not_merged_across_loops(self):
+        """测试同一个 AsyncSingleFlight 在不同事件循环中的调用互不合并"""
+        flight = AsyncSingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        async def blocked():
+            started.set()
+            await asyncio.to_thread(release.wait, 1)
+            return "a"
+
+        async def other():
+            return "b"
+
+        results = {}
+        thread = threading.Thread(
+            target=lambda: results.setdefault("a", asyncio.run(flight.do("k", blocked)))
+        )
+        thread.start()
+        started.wait()
+        try:
+            results["b"] = asyncio.run(asyncio.wait_for(flight.do("k", other), 1))
+        finally:
+            release.set()
+            thread.join()
+
+        assert results == {"a": "a", "b": "b"}
+
+    def test_key_released_after_call(self):
+        """测试调用结束后同 key 会重新执行"""
+        flight = SingleFlight()
+        assert flight.do("k", lambda: 1) == 1
+        assert flight.do("k", lambda: 2) == 2
+
+
+class TestDashScopeMultimodalDetection:
+    """DashScope 多模态检测单元测试"""
+
+    def test_is_multimodal(self, dashscope_model):
+        """测试图片/视频消息识别"""
+        model = dashscope_model()
+        text = {"role": "user", "content": "hi"}
+        image = {"role": "user", "content": [{"text": "看图"}, {"image": "https://x/a.png"}]}
+
+        assert model._is_multimodal([text]) is False
+        assert model._is_multimodal([text, image]) is True
+        assert model._is_multimodal([{"role": "user", "content": [{"text": "a"}]}]) is False
+        assert model._is_multimodal([{"role": "user", "content": ["a", {"video": ["f1"]}]}])
+
+
+class TestModelRegistry:
+    """模型能力注册表单元测试"""
+
+    def test_capabilities_inferred(self):
+        """测试根据参数和模态推断能力标记、features 和思考模式类型"""
+        caps = ModelCapabilities(
+            model_id="anthropic/claude-sonnet-4",
+            name="Claude Sonnet 4",
+            context_length=200000,
+            supported_parameters=["reasoning", "tools"],
+            input_modalities=["text", "image"],
+        )
+
+        assert caps.supports_reasoning and caps.supports_tools and caps.supports_vision
+        assert not caps.supports_file
+        assert caps.features == [
+            ModelFeature.REASONING,
+            ModelFeature.TOOL_CALL,
+            ModelFeature.VISION,
+        ]
+        assert caps.reasoning_type == "max_tokens"
+
+    def test_parameter_and_modality_lookup(self):
+        """测试参数/模态查询，未知模型使用默认值"""
+        model_id = "google/gemini-3-pro-preview"
+
+        assert is_parameter_supported(model_id, "reasoning")
+        assert not is_parameter_supported(model_id, "top_k")
+        assert is_parameter_supported("unknown/model", "top_k")
+        assert get_supported_modalities(model_id) == set(MODEL_REGISTRY[model_id].input_modalities)
+        assert get_supported_modalities("unknown/model") == {"text"}
+
+
+class TestModelVariants:
+    """模型变体单元测试"""
+
+    def test_resolve_variant(self, monkeypatch):
+        """测试变体解析 (未映射时使用 fallback)，运行时修改默认映射立即生效"""
+        assert resolve_variant("dashscope", ModelVariant.FAST, "qwen-plus") == "qwen-turbo"
+        assert resolve_variant("unknown", ModelVariant.FAST, "fallback") == "fallback"
+
+        monkeypatch.setitem(DEFAULT_VARIANT_MAPPINGS, "unknown", {"fast": "custom-fast"})
+        assert resolve_variant("unknown", ModelVariant.FAST, "fallback") == "custom-fast"
+
+
+class TestParallelChat:
+    """多模型并发调用单元测试"""
+
+    @staticmethod
+    def _model(content, delay=0.0, error=None):
+        async def achat(messages):
+            await asyncio.sleep(delay)
+            if error is not None:
+                raise error
+            return {"content": content}
+
+        return SimpleNamespace(achat=achat)
+
+    @pytest.mark.asyncio
+    async def test_multi_chat(self):
+        """测试按模型顺序返回结果，失败和超时的模型对应位置为异常"""
+        sync_model = SimpleNamespace(chat=lambda messages: {"content": "sync"})
+        models = [
+            self._model("a"),
+            self._model("b", error=RuntimeError("boom")),
+            self._model("c", delay=1),
+            sync_model,
+            object(),
+        ]
+
+        results = await multi_chat(models, [{"role": "user", "content": "hi"}], timeout=0.1)
+
+        assert results[0] == {"content": "a"}
+        assert isinstance(results[1], RuntimeError)
+        assert isinstance(results[2], TimeoutError)
+        assert results[3] == {"content": "sync"}
+        assert isinstance(results[4], TypeError)
+
+    @pytest.mark.asyncio
+    async def test_agno_model_uses_aresponse(self):
+        """测试 Agno Model (无 achat/chat) 通过 aresponse() 调用并转换为结果 dict"""
+        received = []
+
+        async def aresponse(messages):
+            received.extend(messages)
+            usage = SimpleNamespace(input_tokens=3, output_tokens=2, total_tokens=5)
+            return SimpleNamespace(content="agno", reasoning_content="想", response_usage=usage)
+
+        results = await multi_chat(
+            [SimpleNamespace(aresponse=aresponse)], [{"role": "user", "content": "hi"}]
+        )
+
+        assert results == [
+            {
+                "content": "agno",
+                "reasoning": "想",
+                "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+            }
+        ]
+        assert isinstance(received[0], Message)
+        assert received[0].content == "hi"
+
+    @pytest.mark.asyncio
+    async def test_first_completed_chat(self):
+        """测试返回最先成功的模型，全部失败时抛出 ExceptionGroup"""
+        messages = [{"role": "user", "content": "hi"}]
+        models = [
+            self._model("slow", delay=1),
+            self._model("bad", error=RuntimeError("boom")),
+            self._model("fast", delay=0.01),
+        ]
+
+        assert await first_completed_chat(models, messages) == (2, {"content": "fast"})
+
+        with pytest.raises(ExceptionGroup):
+            await first_completed_chat([self._model("bad", error=RuntimeError("boom"))], messages)
+
+    @pytest.mark.asyncio
+    async def test_first_completed_chat_cancelled_model(self):
+        """测试模型任务被取消时仍抛出包含 CancelledError 的 BaseExceptionGroup"""
+        models = [
+            self._model("cancelled", error=asyncio.CancelledError()),
+            self._model("bad", error=RuntimeError("boom")),
+        ]
+
+        with pytest.raises(BaseExceptionGroup) as exc_info:
+            await first_completed_chat(models, [{"role": "user", "content": "hi"}])
+
+        assert [type(e) for e in exc_info.value.exceptions] == [
+            asyncio.CancelledError,
+            RuntimeError,
+        ]
+
+
+class TestAdaptersLazyImport:
+    """适配器包按需导入单元测试"""
+
+    def test_lazy_adapter_attribute(self):
+        """测试通过包访问适配器类时才导入对应模块"""
+        assert adapters.VolcengineAdapter is VolcengineAdapter
+        assert "VolcengineAdapter" in dir(adapters)
+        with pytest.raises(AttributeError):
+            _ = adapters.MissingAdapter
+
+    def test_import_does_not_load_sdks(self):
+        """测试导入模型包不会加载 httpx / agno / 厂商 SDK (导入耗时回归)"""
+        heavy = ("httpx", "agno", "dashscope", "volcenginesdkarkruntime", "openai")
+        code = (
+            "import sys, app.models, app.models.adapters.dashscope, "
+            "app.models.adapters.volcengine; "
+            f"print([m for m in {heavy!r} if m in sys.modules])"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == "[]"
+
+
+class TestVolcengineClientReuse:
+    """火山方舟客户端复用单元测试"""
+
+    def test_models_share_client_per_key(self, monkeypatch):
+        """测试相同 API Key 的模型实例共享 Ark 客户端"""
+
+        class FakeArk:
+            def __init__(self, **kwargs):
+                self.kwargs = kwargs
+
+        monkeypatch.setattr(volcengine, "_ark_cls", lambda: FakeArk)
+        volcengine._get_ark_client.cache_clear()
+
+        config = ModelConfig(provider=ModelProvider.VOLCENGINE, model_id="doubao-seed")
+        first = volcengine.VolcengineModel("doubao-seed", "key-a", config)
+        second = volcengine.VolcengineModel("doubao-seed", "key-a", config)
+        other = volcengine.VolcengineModel("doubao-seed", "key-b", config)
+        volcengine._get_ark_client.cache_clear()
+
+        assert first.client is second.client
+        assert other.client is not first.client
+
+    def test_async_ark_client_per_loop(self, monkeypatch):
+        """测试 AsyncArk 客户端在同一事件循环内共享，不同事件循环各自创建"""
+
+        class FakeAsyncArk:
+            def __init__(self, **kwargs):
+                self.kwargs = kwargs
+
+        monkeypatch.setattr(volcengine, "_async_ark_cls", lambda: FakeAsyncArk)
+
+        async def get_clients():
+            client = volcengine._get_async_ark_client("key-a", "url", 10)
+            assert volcengine._get_async_ark_client("key-a", "url", 10) is client
+            assert volcengine._get_async_ark_client("key-b", "url", 10) is not client
+            return client
+
+        assert asyncio.run(get_clients()) is not asyncio.run(get_clients())
+
+
+class TestVolcengineParams:
+    """火山方舟请求参数单元测试"""
+
+    def test_build_params(self):
+        """测试通用参数仅透传非 None 值"""
+        model = VolcengineModel.__new__(VolcengineModel)
+        model.model_id = "doubao-seed"
+        model.config = ModelConfig(temperature=0.2, max_tokens=512, stop=[])
+        model._base_params = volcengine._build_base_params("doubao-seed", model.config)
+        model._web_search_tools = ()
+        messages = [{"role": "user", "content": "hi"}]
+
+        assert model._base_params == {
+            "model": "doubao-seed",
+            "temperature": 0.2,
+            "max_tokens": 512,
+        }
+        assert model._build_request_params(messages, None, stream=True) == {
+            "messages": messages,
+            "stream": True,
+        }
+
+    def test_request_tools(self):
+        """测试联网搜索工具与调用方工具拼接，预构建的工具元组不被修改"""
+        model = VolcengineModel.__new__(VolcengineModel)
+        model.model_id = "doubao-seed"
+        model.config = ModelConfig(web_search=WebSearchConfig(enabled=True))
+        model._base_params, model._web_search_tools = volcengine._static_params(
+            "doubao-seed", model.config
+        )
+        messages = [{"role": "user", "content": "hi"}]
+        extra = {"type": "function", "function": {"name": "f"}}
+
+        assert model._build_request_params(messages, None)["tools"] == [
+            {"type": "web_search", "web_search": {"enable": True}}
+        ]
+        assert model._build_request_params(messages, [extra])["tools"][1] is extra
+        assert len(model._web_search_tools) == 1
+
+    def test_static_params_shared(self):
+        """测试相同配置的实例共享固定参数，不可哈希的配置退回直接构建"""
+        config = ModelConfig(provider=ModelProvider.VOLCENGINE, temperature=0.3)
+        unhashable = ModelConfig(provider=ModelProvider.VOLCENGINE, stop=["\n"])
+
+        assert volcengine._static_params("m", config) is volcengine._static_params("m", config)
+        assert volcengine._static_params("m", unhashable)[0]["stop"] == ["\n"]
+
+    def test_handle_response(self):
+        """测试非流式响应解析 usage / reasoning，缺失的可选字段不写入"""
+        message = SimpleNamespace(content="答案", reasoning_content="思考")
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(prompt_tokens=3, completion_tokens=2, total_tokens=5),
+        )
+
+        result = VolcengineModel.__new__(VolcengineModel)._handle_response(response)
+
+        assert result["content"] == "答案"
+        assert result["reasoning"] == "思考"
+        assert result["usage"] == {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}
+        assert "tool_calls" not in result
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("coalesce_ms", "expected"),
+        [(0, ["你", "好", "啊"]), (1000, ["你", "好啊"])],
+    )
+    async def test_achat_stream(self, monkeypatch, coalesce_ms, expected):
+        """测试异步流式调用使用 AsyncArk、跳过无 choices 的 chunk，并按配置合并 (首个 chunk 立即产出)"""
+
+        def chunk(text):
+            delta = SimpleNamespace(content=text, reasoning_content=None)
+            return SimpleNamespace(choices=[SimpleNamespace(delta=delta)] if text else [])
+
+        async def events():
+            for text in ("你", "", "好", "啊"):
+                yield chunk(text)
+
+        async def create(**params):
+            assert params["stream"] is True
+            return events()
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        monkeypatch.setattr(volcengine, "_get_async_ark_client", lambda *args: client)
+
+        model = volcengine.VolcengineModel.__new__(volcengine.VolcengineModel)
+        model.api_key = "key"
+        model.model_id = "doubao-seed"
+        model.config = ModelConfig(stream_coalesce_ms=coalesce_ms)
+        model._base_params = volcengine._build_base_params("doubao-seed", model.config)
+        model._web_search_tools = ()
+
+        stream = await model.achat([{"role": "user", "content": "hi"}], stream=True)
+
+        assert [c["content"] async for c in stream] == expected